@@ -2,16 +2,77 @@
 Kaivora API Application Factory
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
+from app.core.auth import shutdown_hash_pool
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.middleware.cors import setup_cors
+from app.middleware.compression import setup_compression
 from app.middleware.error_handler import setup_error_handlers
+from app.middleware.profiling import profiler, setup_profiling
+from app.middleware.read_your_writes import setup_read_your_writes
+from app.middleware.traffic_capture import setup_traffic_capture, traffic_recorder
 from app.api.routes import api_router
+from app.api.health import health_router
+from app.api.profiling import profiling_router
+from app.core.openapi import setup_static_openapi
 from app.db.init_db import init_database
+from app.db.write_queue import item_write_queue
+from app.core.events import item_events
+from app.db.crud_tokens import sweep_refresh_tokens_periodically
+from app.db.crud_items import purge_tombstones_periodically
+from app.db.item_stats import reconcile_item_stats_periodically
+from app.db.catalog_snapshot import catalog_read_model, refresh_catalog_periodically
+from app.db.item_archive import archive_items_periodically
+from app.db.session import SessionLocal, replica_pool
 from app.routers import auth
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: connect the event backend and start background
+    sweeps; flush in-process queues on shutdown
+    """
+    await item_events.start()
+    profiler.start()
+    if traffic_recorder is not None:
+        traffic_recorder.start()
+    background = [
+        asyncio.create_task(
+            sweep_refresh_tokens_periodically(SessionLocal, settings.REFRESH_TOKEN_SWEEP_INTERVAL)
+        ),
+        asyncio.create_task(
+            reconcile_item_stats_periodically(SessionLocal, settings.ITEM_STATS_RECONCILE_INTERVAL)
+        ),
+        asyncio.create_task(
+            purge_tombstones_periodically(SessionLocal, settings.ITEM_TOMBSTONE_PURGE_INTERVAL)
+        )
+    ]
+    if replica_pool is not None:
+        background.append(asyncio.create_task(replica_pool.monitor_health()))
+    if catalog_read_model is not None:
+        background.append(asyncio.create_task(
+            refresh_catalog_periodically(catalog_read_model, settings.CATALOG_SNAPSHOT_REFRESH_INTERVAL)
+        ))
+    if settings.ITEM_ARCHIVE_ENABLED:
+        background.append(asyncio.create_task(
+            archive_items_periodically(SessionLocal, settings.ITEM_ARCHIVE_INTERVAL)
+        ))
+    yield
+    for task in background:
+        task.cancel()
+    await item_write_queue.close()
+    shutdown_hash_pool()
+    await item_events.stop()
+    profiler.stop()
+    if traffic_recorder is not None:
+        traffic_recorder.stop()
+
+
 def create_app() -> FastAPI:
     """
     Create and configure FastAPI application
@@ -30,17 +91,32 @@ def create_app() -> FastAPI:
         version=settings.VERSION,
         openapi_url="/api/v1/openapi.json",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        lifespan=lifespan
     )
 
     # Setup CORS middleware
     setup_cors(app)
 
+    # Setup response compression (wraps the routes, so it sees their final body;
+    # middleware added later, such as traffic capture and profiling, wraps it in turn)
+    setup_compression(app)
+
     # Setup error handlers
     setup_error_handlers(app)
 
+    # Setup the client id cookie that keys read-your-writes
+    setup_read_your_writes(app)
+
+    # Setup sampled traffic capture (replayed with scripts/replay_traffic.py)
+    setup_traffic_capture(app)
+
+    # Setup the admin-only sampling profiler (outermost, so it times the whole stack)
+    setup_profiling(app)
+
     # Include API routes
     app.include_router(api_router, prefix="/api/v1")
+    app.include_router(auth.router)
 
     # Root endpoint - redirect to docs
     @app.get("/", include_in_schema=False)
@@ -48,21 +124,15 @@ def create_app() -> FastAPI:
         """Redirect root path to API documentation"""
         return RedirectResponse(url="/docs")
 
-    # Health check endpoint
-    @app.get("/health", tags=["Health"])
-    async def health_check():
-        """
-        Health check endpoint for monitoring
-
-        Returns:
-            dict: Health status information
-        """
-        return {
-            "status": "healthy",
-            "service": settings.PROJECT_NAME,
-            "version": settings.VERSION,
-            "environment": settings.ENVIRONMENT
-        }
+    # Health check endpoints (liveness and readiness)
+    app.include_router(health_router)
+
+    # Profiler admin endpoints
+    if settings.PROFILING_ENABLED:
+        app.include_router(profiling_router)
+
+    # Serve the OpenAPI document from pre-encoded bytes (after all routes exist)
+    setup_static_openapi(app)
 
     return app
 
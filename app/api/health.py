@@ -0,0 +1,105 @@
+"""
+Health and readiness endpoints for Kaivora API
+
+``/health`` is a liveness probe answered from bytes encoded once at import.
+``/health/ready`` checks the database and caches the verdict for
+``settings.READINESS_CACHE_TTL`` seconds so probe traffic stays cheap.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from fastapi import APIRouter, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from app.core.config import settings
+from app.db.session import engine, replica_pool
+
+logger = logging.getLogger(__name__)
+
+health_router = APIRouter(tags=["Health"])
+
+HEALTH_BODY = json.dumps({
+    "status": "healthy",
+    "service": settings.PROJECT_NAME,
+    "version": settings.VERSION,
+    "environment": settings.ENVIRONMENT
+}).encode()
+
+
+def _readiness_body(database_ok: bool) -> bytes:
+    body = {
+        "status": "ready" if database_ok else "unavailable",
+        "database": "ok" if database_ok else "unreachable"
+    }
+    if replica_pool is not None:
+        body["replicas"] = {
+            "healthy": sum(1 for replica in replica_pool.replicas if replica.healthy),
+            "total": len(replica_pool.replicas)
+        }
+    return json.dumps(body).encode()
+
+
+def _check_database() -> bool:
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except DBAPIError as exc:
+        logger.warning(f"Readiness check failed: {exc}")
+        return False
+
+
+class ReadinessCache:
+    """
+    Last readiness verdict, pre-encoded, refreshed at most once per TTL.
+    Concurrent probes during a refresh wait for its result.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.checked_at = float("-inf")
+        self.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        self.body = b""
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        if time.monotonic() - self.checked_at >= self.ttl:
+            async with self._lock:
+                # Another probe may have refreshed it while this one waited
+                if time.monotonic() - self.checked_at >= self.ttl:
+                    database_ok = await run_in_threadpool(_check_database)
+                    self.status_code = status.HTTP_200_OK if database_ok else status.HTTP_503_SERVICE_UNAVAILABLE
+                    self.body = _readiness_body(database_ok)
+                    self.checked_at = time.monotonic()
+        return self.status_code, self.body
+
+
+readiness_cache = ReadinessCache(settings.READINESS_CACHE_TTL)
+
+
+@health_router.get("/health")
+async def health_check():
+    """
+    Health check endpoint for monitoring
+
+    Returns:
+        Response: Pre-encoded health status information
+    """
+    return Response(content=HEALTH_BODY, media_type="application/json")
+
+
+@health_router.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness check: verifies the primary database answers, cached for a short TTL
+
+    Returns:
+        Response: 200 when ready, 503 when the database is unreachable
+    """
+    status_code, body = await readiness_cache.get()
+    return Response(content=body, status_code=status_code, media_type="application/json")
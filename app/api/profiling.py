@@ -0,0 +1,73 @@
+"""
+Admin endpoints for the continuous sampling profiler
+
+Mounted only when ``PROFILING_ENABLED`` is set; every route requires
+``X-API-Key``. Hot stacks are collected when ``PROFILING_CONTINUOUS_INTERVAL``
+is above zero (see app/middleware/profiling.py).
+"""
+
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
+from app.core.auth import require_api_key
+from app.middleware.profiling import StackProfile, profiler
+
+profiling_router = APIRouter(
+    prefix="/admin/profiling",
+    tags=["Admin"],
+    dependencies=[Depends(require_api_key)]
+)
+
+
+@profiling_router.get("/hot-stacks")
+async def hot_stacks(
+    route: Optional[str] = Query(None, description="Route label, e.g. 'GET /api/v1/items'"),
+    limit: int = Query(20, ge=1, le=500),
+    output: Literal["json", "html", "speedscope"] = Query("json")
+):
+    """
+    Hottest sampled stacks per route since start (or the last reset)
+
+    Returns:
+        JSON summary of every route, or the flame graph / speedscope document of one route
+    """
+    if not profiler.continuous:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Continuous profiling is off (set PROFILING_CONTINUOUS_INTERVAL)"
+        )
+
+    with profiler.lock:
+        if output != "json":
+            if route not in profiler.routes:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No samples for route {route!r}")
+            profile = profiler.routes[route]
+            if output == "speedscope":
+                return Response(profile.speedscope(route), media_type="application/json")
+            return Response(profile.html(route), media_type="text/html")
+
+        routes = sorted(profiler.routes.items(), key=lambda entry: entry[1].total, reverse=True)
+        return {
+            "interval": profiler.continuous_interval,
+            "routes": [
+                _summary(label, profile, limit)
+                for label, profile in routes
+                if route is None or label == route
+            ]
+        }
+
+
+@profiling_router.delete("/hot-stacks", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_hot_stacks():
+    """Discard the samples collected so far"""
+    profiler.reset()
+
+
+def _summary(label: str, profile: StackProfile, limit: int) -> dict:
+    return {
+        "route": label,
+        "samples": profile.samples,
+        "ms": round(profile.total * 1000, 2),
+        "stacks": profile.hot_stacks(limit)
+    }
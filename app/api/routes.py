@@ -2,9 +2,13 @@
 API Routes for Kaivora API
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import Field, TypeAdapter, ValidationError
+from sqlalchemy import insert
+from typing import Annotated, Any, Callable, List, Optional, Set
 from sqlalchemy.orm import Session
 import logging
 
@@ -13,10 +17,25 @@ from app.models.schemas import (
     ItemCreate,
     ItemResponse,
     ItemUpdate,
+    ItemChanges,
+    ItemBatchRequest,
+    ItemBatchResponse,
+    ItemStatsResponse,
     ErrorResponse
 )
-from app.db.session import get_db
-from app.db.models import Item
+from app.core.config import settings
+from app.core.events import CREATED, DELETED, UPDATED, item_events
+from app.core.singleflight import SingleFlight
+from app.db.session import SessionLocal, client_key, engine, get_db, get_read_db, recent_writers
+from app.db.catalog_snapshot import catalog_read_model
+from app.db.item_stats import ensure_item_stats, item_facts, item_stats
+from app.db.write_queue import item_write_queue
+from app.db.models import ArchivedItem, Item, ItemTombstone, utcnow
+from app.db.item_archive import restore_item
+from app.db.crud_items import (
+    ItemOrdering, decode_watermark, encode_watermark, get_item_changes, get_items_by_ids, query_items,
+    watermark_expired
+)
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -24,6 +43,133 @@ logger = logging.getLogger(__name__)
 # Create API router
 api_router = APIRouter()
 
+# Concurrent identical reads share one query and one serialization
+read_flight = SingleFlight()
+item_list_adapter = TypeAdapter(List[ItemResponse])
+# Validates a whole JSON array of new items in one pydantic-core pass; an
+# oversized array fails once the count passes the limit, so at most
+# ITEM_BULK_MAX_ITEMS + 1 elements are validated before it is rejected
+item_create_list_adapter = TypeAdapter(
+    Annotated[List[ItemCreate], Field(max_length=settings.ITEM_BULK_MAX_ITEMS)]
+)
+
+
+def item_to_response(db_item: Item) -> ItemResponse:
+    return ItemResponse(
+        id=db_item.id,
+        name=db_item.name,
+        description=db_item.description,
+        price=db_item.price,
+        is_active=db_item.is_active,
+        created_at=db_item.created_at,
+        updated_at=db_item.updated_at
+    )
+
+
+async def _coalesced(key: tuple, request: Request, db: Session, fetch: Callable[[Session], Any]) -> Any:
+    """
+    Run a blocking read in the threadpool, shared with identical concurrent reads.
+
+    A client that wrote recently (read-your-writes) never joins a shared read:
+    one started before its commit could return the old row, so it reads on
+    its own. Primary and replica reads are never merged either. The shared
+    call opens its own session on the same database: it outlives a cancelled
+    leader, whose request session is closed by its teardown.
+    """
+    if not settings.SINGLE_FLIGHT_ENABLED or recent_writers.wrote_recently(client_key(request)):
+        return await run_in_threadpool(fetch, db)
+    bind = db.get_bind()
+
+    def shared() -> Any:
+        session = Session(bind=bind, autoflush=False)
+        try:
+            return fetch(session)
+        finally:
+            session.close()
+
+    return await read_flight.do(key + (bind is engine,), lambda: run_in_threadpool(shared))
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """
+    Read the request body, rejecting it with 413 as soon as it exceeds max_bytes
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Request body is larger than {max_bytes} bytes"
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+# list_items parameters that do not apply to an ids lookup
+LIST_QUERY_PARAMS = frozenset({"skip", "limit", "min_price", "max_price", "is_active", "order_by"})
+
+
+def _parse_ids(ids: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse a comma-separated ID list, keeping order and dropping duplicates
+    """
+    if not ids:
+        return None
+    try:
+        return list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise ValueError(f"ids must be a comma-separated list of integers, got {ids!r}")
+
+
+def _parse_id_set(ids: Optional[str]) -> Optional[Set[int]]:
+    parsed = _parse_ids(ids)
+    return None if parsed is None else set(parsed)
+
+
+async def _fetch_items_by_ids(ids: List[int], db: Session) -> ItemBatchResponse:
+    """
+    Resolve IDs with one IN query, in request order, reporting missing IDs
+    """
+    if len(ids) > settings.ITEM_BATCH_MAX_IDS:
+        raise ValueError(f"At most {settings.ITEM_BATCH_MAX_IDS} ids can be fetched at once")
+
+    def fetch() -> ItemBatchResponse:
+        found = get_items_by_ids(db, ids)
+        return ItemBatchResponse(
+            items=[item_to_response(found[item_id]) for item_id in ids if item_id in found],
+            missing=[item_id for item_id in ids if item_id not in found]
+        )
+
+    return await run_in_threadpool(fetch)
+
+# api_info is static: encode it once instead of validating per request
+API_INFO_BODY = APIResponse(
+    message="Kaivora API is running successfully",
+    data={
+        "endpoints": [
+            "GET /api/v1/ - API Information",
+            "GET /api/v1/items - List all items",
+            "GET /api/v1/items?ids=1,2,3 - Get several items by ID",
+            "POST /api/v1/items/batch-get - Get several items by ID",
+            "POST /api/v1/items - Create new item",
+            "POST /api/v1/items/bulk - Create many items",
+            "GET /api/v1/items/{item_id} - Get specific item",
+            "PUT /api/v1/items/{item_id} - Update specific item",
+            "DELETE /api/v1/items/{item_id} - Delete specific item",
+            "GET /api/v1/items/changes - Items changed since a watermark",
+            "GET /api/v1/items/stats - Catalog statistics",
+            "GET /api/v1/items/events - Live item change events (SSE)",
+            "WS /api/v1/items/ws - Live item change events (WebSocket)",
+            "POST /auth/register - Register new user",
+            "POST /auth/login - Login with credentials"
+        ]
+    }
+).model_dump_json().encode()
+
 @api_router.get(
     "/",
     response_model=APIResponse,
@@ -31,41 +177,72 @@ api_router = APIRouter()
     description="Get basic information about the Kaivora API"
 )
 async def api_info():
-    return APIResponse(
-        message="Kaivora API is running successfully",
-        data={
-            "endpoints": [
-                "GET /api/v1/ - API Information",
-                "GET /api/v1/items - List all items",
-                "POST /api/v1/items - Create new item",
-                "GET /api/v1/items/{item_id} - Get specific item",
-                "PUT /api/v1/items/{item_id} - Update specific item",
-                "DELETE /api/v1/items/{item_id} - Delete specific item",
-                "POST /auth/register - Register new user",
-                "POST /auth/login - Login with credentials"
-            ]
-        }
-    )
+    return Response(content=API_INFO_BODY, media_type="application/json")
 
 @api_router.get(
     "/items",
     response_model=List[ItemResponse],
     summary="List Items",
-    description="Retrieve all items from the system"
+    description=(
+        "Retrieve all items from the system, optionally filtered by price range and active flag and "
+        "sorted by `order_by` (`id`, `price`, `-price`, `updated_at`, `-updated_at`). With `ids=1,2,3` "
+        "only those items are returned, in the requested order; `ids` cannot be combined with paging, "
+        "filters or ordering (400). IDs that do not exist are counted in `X-Missing-Count` and the "
+        "first ITEM_MISSING_IDS_HEADER_MAX of them listed in `X-Missing-Ids`; `POST /items/batch-get` "
+        "returns the full list in the body. Archived items are only returned through `ids`."
+    )
 )
-async def list_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_items(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0),
+    ids: Optional[str] = Query(None, description="Comma-separated item IDs to fetch in one query"),
+    min_price: Optional[float] = Query(None, description="Only items with price >= min_price"),
+    max_price: Optional[float] = Query(None, description="Only items with price <= max_price"),
+    is_active: Optional[bool] = Query(None, description="Only active (true) or inactive (false) items"),
+    order_by: ItemOrdering = Query("id", description="Sort key; prefix with - for descending"),
+    db: Session = Depends(get_read_db)
+):
+    if ids is not None:
+        ignored = LIST_QUERY_PARAMS.intersection(request.query_params)
+        if ignored:
+            raise ValueError(f"ids cannot be combined with {', '.join(sorted(ignored))}")
+        id_list = _parse_ids(ids) or []
+        logger.info(f"Fetching {len(id_list)} items by ID")
+        batch = await _fetch_items_by_ids(id_list, db)
+        headers = None
+        if batch.missing:
+            # Capped: a header of thousands of ids would overflow proxy buffers
+            headers = {
+                "X-Missing-Count": str(len(batch.missing)),
+                "X-Missing-Ids": ",".join(map(str, batch.missing[:settings.ITEM_MISSING_IDS_HEADER_MAX]))
+            }
+        return Response(
+            content=item_list_adapter.dump_json(batch.items),
+            media_type="application/json",
+            headers=headers
+        )
+
     logger.info(f"Listing items with skip={skip}, limit={limit}")
-    items = db.query(Item).offset(skip).limit(limit).all()
+    filters = (min_price, max_price, is_active, order_by)
 
-    return [ItemResponse(
-        id=item.id,
-        name=item.name,
-        description=item.description,
-        price=item.price,
-        is_active=item.is_active,
-        created_at=item.created_at,
-        updated_at=item.updated_at
-    ) for item in items]
+    # Served from the in-memory catalog, unless this client just wrote (read-your-writes)
+    if catalog_read_model is not None and not recent_writers.wrote_recently(client_key(request)):
+        snapshot = await catalog_read_model.current()
+
+        def query_snapshot() -> bytes:
+            rows = snapshot.query(skip, limit, *filters)
+            return item_list_adapter.dump_json([ItemResponse(**row) for row in rows])
+
+        body = await run_in_threadpool(query_snapshot)
+        return Response(content=body, media_type="application/json")
+
+    def fetch(db: Session) -> bytes:
+        items = query_items(db, skip, limit, *filters)
+        return item_list_adapter.dump_json([item_to_response(item) for item in items])
+
+    body = await _coalesced(("items", skip, limit) + filters, request, db, fetch)
+    return Response(content=body, media_type="application/json")
 
 @api_router.post(
     "/items",
@@ -85,52 +262,264 @@ async def create_item(item: ItemCreate, db: Session = Depends(get_db)):
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    item_stats.apply(None, item_facts(db_item))
 
-    return ItemResponse(
-        id=db_item.id,
-        name=db_item.name,
-        description=db_item.description,
-        price=db_item.price,
-        is_active=db_item.is_active,
-        created_at=db_item.created_at,
-        updated_at=db_item.updated_at
+    response = item_to_response(db_item)
+    await item_events.publish(CREATED, db_item.id, response.model_dump(mode="json"))
+    return response
+
+@api_router.post(
+    "/items/bulk",
+    response_model=APIResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create Items",
+    description=(
+        "Create many items from a JSON array of `ItemCreate` objects. The array is validated in one "
+        "pass and inserted with a single statement; any invalid element rejects the whole request. "
+        "Arrays over ITEM_BULK_MAX_ITEMS are rejected with 400, bodies over ITEM_BULK_MAX_BYTES with 413."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/ItemCreate"},
+                        "maxItems": settings.ITEM_BULK_MAX_ITEMS
+                    }
+                }
+            }
+        }
+    }
+)
+async def create_items(request: Request, db: Session = Depends(get_db)):
+    try:
+        items = item_create_list_adapter.validate_json(
+            await _read_body(request, settings.ITEM_BULK_MAX_BYTES)
+        )
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False)
+        # Reported on its own, without echoing the whole array back
+        if errors[0]["type"] == "too_long" and not errors[0]["loc"]:
+            raise ValueError(f"At most {settings.ITEM_BULK_MAX_ITEMS} items can be created at once")
+        raise RequestValidationError(
+            [{**error, "loc": ("body",) + tuple(error["loc"])} for error in errors]
+        )
+    logger.info(f"Creating {len(items)} items")
+
+    def write():
+        if not items:
+            return []
+        table = Item.__table__
+        rows = db.execute(
+            insert(table).returning(*table.c, sort_by_parameter_order=True),
+            [{**item.model_dump(), "is_active": True} for item in items]
+        ).all()
+        db.commit()
+        return rows
+
+    rows = await run_in_threadpool(write)
+    for row in rows:
+        item_stats.apply(None, item_facts(row))
+    await item_events.publish_many(
+        CREATED, ((row.id, item_to_response(row).model_dump(mode="json")) for row in rows)
     )
 
+    return APIResponse(
+        message=f"{len(rows)} items created successfully",
+        data={"created": len(rows), "ids": [row.id for row in rows]}
+    )
+
+@api_router.post(
+    "/items/batch-get",
+    response_model=ItemBatchResponse,
+    summary="Get Items by IDs",
+    description="Retrieve many items with a single query, in request order, reporting IDs that do not exist"
+)
+async def batch_get_items(request: ItemBatchRequest, db: Session = Depends(get_read_db)):
+    logger.info(f"Fetching {len(request.ids)} items by ID")
+    return await _fetch_items_by_ids(list(dict.fromkeys(request.ids)), db)
+
+@api_router.get(
+    "/items/stats",
+    response_model=ItemStatsResponse,
+    summary="Item Statistics",
+    description=(
+        "Catalog statistics kept up to date by item writes and reconciled against the database every "
+        "few minutes. Price figures cover active items only."
+    )
+)
+async def get_item_stats(days: int = Query(30, ge=1, le=366, description="Days of creation history")):
+    stats = await ensure_item_stats(SessionLocal)
+    return Response(content=stats.encoded(days), media_type="application/json")
+
+@api_router.get(
+    "/items/changes",
+    response_model=ItemChanges,
+    summary="Item Changes",
+    description=(
+        "Items created, updated, deleted or archived after a watermark, oldest first. Start without "
+        "`since`, then pass the returned `watermark` on each call. Apply changes idempotently. Changes "
+        "appear after CHANGE_FEED_SAFETY_LAG seconds. A watermark older than ITEM_TOMBSTONE_RETENTION_DAYS "
+        "(deletions are forgotten after that) is answered with 410: start again without `since`."
+    ),
+    responses={status.HTTP_410_GONE: {"description": "Watermark too old; resync from scratch"}}
+)
+async def list_item_changes(
+    since: Optional[str] = Query(None, description="Watermark from a previous call"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_read_db)
+):
+    cursor = decode_watermark(since) if since else None
+    if cursor is not None and watermark_expired(cursor):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"Watermark is older than {settings.ITEM_TOMBSTONE_RETENTION_DAYS:g} days; resync without since"
+        )
+
+    def fetch() -> ItemChanges:
+        items, deleted, archived, watermark, has_more = get_item_changes(db, cursor, limit)
+        return ItemChanges(
+            items=[item_to_response(item) for item in items],
+            deleted=deleted,
+            archived=archived,
+            watermark=encode_watermark(watermark) if watermark else since,
+            has_more=has_more
+        )
+
+    return await run_in_threadpool(fetch)
+
+@api_router.get(
+    "/items/events",
+    summary="Item Event Stream",
+    description=(
+        "Server-Sent Events stream of item `created`, `updated`, `deleted` and `archived` events, optionally "
+        "limited to `ids`. A client that falls too far behind receives a `resync` event and should "
+        "catch up through `/items/changes`."
+    ),
+    response_class=StreamingResponse
+)
+async def stream_item_events(ids: Optional[str] = Query(None, description="Comma-separated item IDs")):
+    subscriber = item_events.subscribe(_parse_id_set(ids))
+
+    async def stream():
+        try:
+            # Flush headers right away; clients reconnect after 3s if cut off
+            yield b"retry: 3000\n\n"
+            while True:
+                event = await subscriber.next_event(settings.EVENT_HEARTBEAT_INTERVAL)
+                if event is not None:
+                    yield event.sse
+                elif subscriber.dropped:
+                    yield b"event: resync\ndata: {}\n\n"
+                    return
+                else:
+                    yield b": keepalive\n\n"
+        finally:
+            item_events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.websocket("/items/ws")
+async def item_events_websocket(websocket: WebSocket, ids: Optional[str] = None):
+    await websocket.accept()
+    subscriber = item_events.subscribe(_parse_id_set(ids))
+    try:
+        while True:
+            event = await subscriber.next_event(settings.EVENT_HEARTBEAT_INTERVAL)
+            if event is not None:
+                await websocket.send_text(event.payload.decode())
+            elif subscriber.dropped:
+                await websocket.send_text('{"type":"resync"}')
+                await websocket.close()
+                return
+            else:
+                # Also detects clients that went away without a close frame
+                await websocket.send_text('{"type":"keepalive"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        item_events.unsubscribe(subscriber)
+
 @api_router.get(
     "/items/{item_id}",
     response_model=ItemResponse,
     summary="Get Item",
-    description="Retrieve a specific item by ID"
+    description="Retrieve a specific item by ID, including archived items"
 )
-async def get_item(item_id: int, db: Session = Depends(get_db)):
+async def get_item(request: Request, item_id: int, db: Session = Depends(get_read_db)):
     logger.info(f"Retrieving item with ID: {item_id}")
-    db_item = db.query(Item).filter(Item.id == item_id).first()
-    if db_item is None:
+
+    def fetch(db: Session) -> Optional[bytes]:
+        db_item = db.get(Item, item_id) or db.get(ArchivedItem, item_id)
+        return None if db_item is None else item_to_response(db_item).model_dump_json().encode()
+
+    body = await _coalesced(("item", item_id), request, db, fetch)
+    if body is None:
         logger.warning(f"Item not found: {item_id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Item with ID {item_id} not found"
         )
 
-    return ItemResponse(
-        id=db_item.id,
-        name=db_item.name,
-        description=db_item.description,
-        price=db_item.price,
-        is_active=db_item.is_active,
-        created_at=db_item.created_at,
-        updated_at=db_item.updated_at
-    )
+    return Response(content=body, media_type="application/json")
 
 @api_router.put(
     "/items/{item_id}",
     response_model=ItemResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": APIResponse, "description": "Update queued (deferred=true)"}},
     summary="Update Item",
-    description="Update a specific item by ID"
+    description=(
+        "Update a specific item by ID. With `deferred=true` (and WRITE_BEHIND_ENABLED) the update is "
+        "queued, coalesced with other updates to the same item and written in a batch; the response is "
+        "202. Add `durable=true` to wait until that batch is committed (404 if the item does not exist)."
+    )
 )
-async def update_item(item_id: int, item_update: ItemUpdate, db: Session = Depends(get_db)):
+async def update_item(
+    request: Request,
+    item_id: int,
+    item_update: ItemUpdate,
+    deferred: bool = Query(False, description="Queue the update for a batched write"),
+    durable: bool = Query(False, description="With deferred, wait until the write is committed"),
+    db: Session = Depends(get_db)
+):
     logger.info(f"Updating item with ID: {item_id}")
-    db_item = db.query(Item).filter(Item.id == item_id).first()
+    update_data = item_update.model_dump(exclude_unset=True)
+
+    if deferred and settings.WRITE_BEHIND_ENABLED:
+        committed = item_write_queue.enqueue(item_id, update_data)
+        # Committed later by the queue's own session: count the client as a writer now
+        recent_writers.record(client_key(request))
+        if durable:
+            try:
+                result = await committed
+            except Exception:
+                result = None
+            if result is None or item_id in result.failed:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Deferred update of item {item_id} could not be committed"
+                )
+            if item_id not in result.updated:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Item with ID {item_id} not found"
+                )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=APIResponse(
+                message=f"Update of item {item_id} {'committed' if durable else 'queued'}",
+                data={"item_id": item_id, "committed": durable}
+            ).model_dump(mode="json")
+        )
+
+    # Archived items move back to the hot table when written to
+    db_item = db.query(Item).filter(Item.id == item_id).first() or restore_item(db, item_id)
     if db_item is None:
         logger.warning(f"Item not found for update: {item_id}")
         raise HTTPException(
@@ -138,22 +527,17 @@ async def update_item(item_id: int, item_update: ItemUpdate, db: Session = Depen
             detail=f"Item with ID {item_id} not found"
         )
 
-    update_data = item_update.dict(exclude_unset=True)
+    before = item_facts(db_item)
     for field, value in update_data.items():
         setattr(db_item, field, value)
 
     db.commit()
     db.refresh(db_item)
+    item_stats.apply(before, item_facts(db_item))
 
-    return ItemResponse(
-        id=db_item.id,
-        name=db_item.name,
-        description=db_item.description,
-        price=db_item.price,
-        is_active=db_item.is_active,
-        created_at=db_item.created_at,
-        updated_at=db_item.updated_at
-    )
+    response = item_to_response(db_item)
+    await item_events.publish(UPDATED, item_id, response.model_dump(mode="json"))
+    return response
 
 @api_router.delete(
     "/items/{item_id}",
@@ -163,7 +547,7 @@ async def update_item(item_id: int, item_update: ItemUpdate, db: Session = Depen
 )
 async def delete_item(item_id: int, db: Session = Depends(get_db)):
     logger.info(f"Deleting item with ID: {item_id}")
-    db_item = db.query(Item).filter(Item.id == item_id).first()
+    db_item = db.query(Item).filter(Item.id == item_id).first() or db.get(ArchivedItem, item_id)
     if db_item is None:
         logger.warning(f"Item not found for deletion: {item_id}")
         raise HTTPException(
@@ -171,8 +555,12 @@ async def delete_item(item_id: int, db: Session = Depends(get_db)):
             detail=f"Item with ID {item_id} not found"
         )
 
+    before = item_facts(db_item)
     db.delete(db_item)
+    db.merge(ItemTombstone(item_id=item_id, deleted_at=utcnow()))
     db.commit()
+    item_stats.apply(before, None)
+    await item_events.publish(DELETED, item_id)
 
     return APIResponse(
         message=f"Item '{db_item.name}' deleted successfully",
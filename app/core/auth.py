@@ -1,5 +1,14 @@
 # app/core/auth.py
 
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from fastapi import Header, HTTPException, status
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
@@ -16,11 +25,48 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+# ⚡ Hash de muitas senhas em paralelo: o bcrypt libera o GIL, então threads usam todos os núcleos
+# (sem fork de um servidor com várias threads)
+_hash_pool: Optional[ThreadPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+            _hash_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+    return list(_hash_pool.map(hash_password, passwords))
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown()
+            _hash_pool = None
+
 # 🛡️ Função para gerar o token JWT de acesso
-def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=30)) -> str:
+def create_access_token(
+    data: dict,
+    expires_delta: timedelta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+# 🔄 Refresh tokens: opaque random strings; only their HMAC is stored
+def create_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> bytes:
+    return hmac.new(settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256).digest()
+
+# 🔑 Dependência para rotas administrativas: exige o header X-API-Key = settings.API_KEY
+def require_api_key(x_api_key: Optional[str] = Header(None)) -> None:
+    if not settings.API_KEY or not x_api_key or not hmac.compare_digest(x_api_key, settings.API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing API key"
+        )
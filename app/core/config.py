@@ -35,15 +35,109 @@ class Settings:
     # API Configuration
     API_V1_PREFIX: str = "/api/v1"
 
+    # Readiness probe: how long a database check result is reused (seconds)
+    READINESS_CACHE_TTL: float = float(os.getenv("READINESS_CACHE_TTL", "2"))
+
+    # Coalesce concurrent identical item reads into one query
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+    # Maximum number of IDs per batch fetch (GET /items?ids=..., POST /items/batch-get)
+    ITEM_BATCH_MAX_IDS: int = int(os.getenv("ITEM_BATCH_MAX_IDS", "5000"))
+    ITEM_MISSING_IDS_HEADER_MAX: int = int(os.getenv("ITEM_MISSING_IDS_HEADER_MAX", "100"))  # X-Missing-Ids
+    ITEM_BULK_MAX_ITEMS: int = int(os.getenv("ITEM_BULK_MAX_ITEMS", "10000"))  # POST /items/bulk
+    ITEM_BULK_MAX_BYTES: int = int(os.getenv("ITEM_BULK_MAX_BYTES", str(16 * 1024 * 1024)))  # its body size
+
+    # Item statistics: price histogram bucket edges and full reconcile period (seconds)
+    ITEM_STATS_PRICE_BUCKETS: list = [
+        float(edge) for edge in os.getenv("ITEM_STATS_PRICE_BUCKETS", "10,50,100,500,1000").split(",")
+    ]
+    ITEM_STATS_RECONCILE_INTERVAL: float = float(os.getenv("ITEM_STATS_RECONCILE_INTERVAL", "300"))
+
+    # Change feed: changes younger than the lag (seconds) are held back until their transaction has surely
+    # committed; tombstones are kept for the retention, the oldest watermark /items/changes accepts
+    CHANGE_FEED_SAFETY_LAG: float = float(os.getenv("CHANGE_FEED_SAFETY_LAG", "5"))
+    ITEM_TOMBSTONE_RETENTION_DAYS: float = float(os.getenv("ITEM_TOMBSTONE_RETENTION_DAYS", "30"))
+    ITEM_TOMBSTONE_PURGE_INTERVAL: float = float(os.getenv("ITEM_TOMBSTONE_PURGE_INTERVAL", "3600"))
+
+    # In-memory columnar catalog for list_items (requires NumPy)
+    CATALOG_SNAPSHOT_ENABLED: bool = os.getenv("CATALOG_SNAPSHOT_ENABLED", "false").lower() == "true"
+    CATALOG_SNAPSHOT_MAX_STALENESS: float = float(os.getenv("CATALOG_SNAPSHOT_MAX_STALENESS", "2"))
+    CATALOG_SNAPSHOT_REFRESH_INTERVAL: float = float(os.getenv("CATALOG_SNAPSHOT_REFRESH_INTERVAL", "1"))
+
+    # Hot/cold tiering: move inactive (or, optionally, any long-untouched) items to items_archive
+    ITEM_ARCHIVE_ENABLED: bool = os.getenv("ITEM_ARCHIVE_ENABLED", "false").lower() == "true"
+    ITEM_ARCHIVE_INACTIVE_AFTER_DAYS: float = float(os.getenv("ITEM_ARCHIVE_INACTIVE_AFTER_DAYS", "7"))
+    ITEM_ARCHIVE_MAX_AGE_DAYS: float = float(os.getenv("ITEM_ARCHIVE_MAX_AGE_DAYS", "0"))  # 0 = inactive items only
+    ITEM_ARCHIVE_BATCH_SIZE: int = int(os.getenv("ITEM_ARCHIVE_BATCH_SIZE", "1000"))
+    ITEM_ARCHIVE_BATCH_PAUSE: float = float(os.getenv("ITEM_ARCHIVE_BATCH_PAUSE", "0.1"))
+    ITEM_ARCHIVE_INTERVAL: float = float(os.getenv("ITEM_ARCHIVE_INTERVAL", "3600"))
+
+    # Write-behind item updates (PUT /items/{id}?deferred=true)
+    WRITE_BEHIND_ENABLED: bool = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    WRITE_BEHIND_FLUSH_INTERVAL: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "0.2"))
+    WRITE_BEHIND_MAX_BATCH: int = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+
+    # Live item events (SSE / WebSocket)
+    EVENT_SUBSCRIBER_BUFFER: int = int(os.getenv("EVENT_SUBSCRIBER_BUFFER", "256"))
+    EVENT_HEARTBEAT_INTERVAL: float = float(os.getenv("EVENT_HEARTBEAT_INTERVAL", "15"))
+    # "module:ClassName" of a BroadcastBackend for multi-worker fan-out; empty = in-process only
+    EVENT_BROADCAST_BACKEND: str = os.getenv("EVENT_BROADCAST_BACKEND", "")
+
+    # Response Compression
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "5"))
+    ZSTD_LEVEL: int = int(os.getenv("ZSTD_LEVEL", "3"))
+    COMPRESSION_CACHE_SIZE: int = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+    # Total compressed bytes kept per worker; a body over 1/8 of it is not cached
+    COMPRESSION_CACHE_MAX_BYTES: int = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    COMPRESSION_CACHE_PATHS: list = [
+        "/api/v1/openapi.json",
+        "/api/v1/",
+        "/api/v1/items"
+    ]
+
+    # Sampling profiler (admin only, see app/middleware/profiling.py); nothing is installed when disabled
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_INTERVAL: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.001"))  # per-request profiles
+    PROFILING_CONTINUOUS_INTERVAL: float = float(os.getenv("PROFILING_CONTINUOUS_INTERVAL", "0"))  # 0 = off, e.g. 0.05
+    PROFILING_MAX_STACKS: int = int(os.getenv("PROFILING_MAX_STACKS", "2000"))  # distinct stacks kept per route
+
+    # Sampled traffic capture for offline replay (see scripts/replay_traffic.py)
+    TRAFFIC_CAPTURE_ENABLED: bool = os.getenv("TRAFFIC_CAPTURE_ENABLED", "false").lower() == "true"
+    TRAFFIC_CAPTURE_SAMPLE_RATE: float = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "0.05"))
+    TRAFFIC_CAPTURE_PATH: str = os.getenv("TRAFFIC_CAPTURE_PATH", "./captures/traffic.jsonl")
+    TRAFFIC_CAPTURE_MAX_BYTES: int = int(os.getenv("TRAFFIC_CAPTURE_MAX_BYTES", str(20 * 1024 * 1024)))
+    TRAFFIC_CAPTURE_BACKUPS: int = int(os.getenv("TRAFFIC_CAPTURE_BACKUPS", "10"))  # rotated files, gzipped
+    TRAFFIC_CAPTURE_MAX_BODY: int = int(os.getenv("TRAFFIC_CAPTURE_MAX_BODY", "16384"))  # larger bodies: size only
+    # Record JSON/form body values (credentials still masked); by default only their structure and types
+    TRAFFIC_CAPTURE_BODY_VALUES: bool = os.getenv("TRAFFIC_CAPTURE_BODY_VALUES", "false").lower() == "true"
+
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "kaivora-api-secret-key-change-in-production")
     ALGORITHM: str = "HS256"  # 🔐 Adicionado dentro da classe para fácil acesso
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+    PASSWORD_HASH_WORKERS: Optional[int] = int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None  # None = one per CPU
+    USER_IMPORT_CHUNK_SIZE: int = int(os.getenv("USER_IMPORT_CHUNK_SIZE", "1000"))
+    REFRESH_TOKEN_SWEEP_INTERVAL: float = float(os.getenv("REFRESH_TOKEN_SWEEP_INTERVAL", "3600"))
 
-    # Database (for future use)
-    DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
+    # Database
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./kaivora.db")
+
+    # Read replicas (comma-separated URLs); empty means all reads hit the primary
+    DATABASE_REPLICA_URLS: list = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    REPLICA_SELECTION: str = os.getenv("REPLICA_SELECTION", "round_robin")  # or "least_connections"
+    REPLICA_HEALTH_CHECK_INTERVAL: float = float(os.getenv("REPLICA_HEALTH_CHECK_INTERVAL", "10"))
+    READ_YOUR_WRITES_WINDOW: float = float(os.getenv("READ_YOUR_WRITES_WINDOW", "5"))
+    # Client id cookie issued on writes; keys read-your-writes when there is no bearer token
+    READ_YOUR_WRITES_COOKIE: str = os.getenv("READ_YOUR_WRITES_COOKIE", "kaivora_client")
 
     # External API Keys (if needed)
     API_KEY: Optional[str] = os.getenv("API_KEY")
@@ -0,0 +1,201 @@
+"""
+Item change events: in-process pub/sub with a pluggable cross-worker backend
+
+Every publish goes through a broadcast backend, which delivers the encoded
+event to the hub of every worker (the default ``LocalBroadcast`` only knows
+the current process). The hub encodes each event once and fans the shared
+bytes out to subscribers. Each subscriber has a bounded buffer; a subscriber
+that falls ``buffer_size`` events behind is dropped and told to resync from
+``GET /api/v1/items/changes``.
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CREATED, UPDATED, DELETED, ARCHIVED = "created", "updated", "deleted", "archived"
+
+
+class ItemEvent(NamedTuple):
+    type: str
+    item_id: int
+    payload: bytes  # JSON document, shared by every subscriber
+    sse: bytes  # Pre-rendered text/event-stream frame
+
+
+class Subscriber:
+    """
+    One live stream: a bounded buffer plus a wake-up event
+    """
+
+    __slots__ = ("buffer", "item_ids", "dropped", "_wakeup")
+
+    def __init__(self, item_ids: Optional[Set[int]] = None):
+        self.buffer: deque = deque()
+        self.item_ids = item_ids
+        self.dropped = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: ItemEvent, limit: int) -> bool:
+        if len(self.buffer) >= limit:
+            self.dropped = True
+            self.buffer.clear()
+            self._wakeup.set()
+            return False
+        self.buffer.append(event)
+        self._wakeup.set()
+        return True
+
+    async def next_event(self, timeout: float) -> Optional[ItemEvent]:
+        """
+        Next buffered event, or None on timeout (time for a heartbeat)
+        """
+        while not self.buffer:
+            self._wakeup.clear()
+            if self.dropped:
+                return None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.buffer.popleft()
+
+
+class BroadcastBackend(ABC):
+    """
+    Cross-worker transport. Implementations call ``deliver`` with every
+    message published by any worker, including this one; ``deliver`` may be
+    called from any thread.
+    """
+
+    def __init__(self, deliver: Callable[[bytes], None]):
+        self.deliver = deliver
+
+    async def start(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, message: bytes) -> None:
+        """Send ``message`` to the hub of every worker"""
+
+    async def stop(self) -> None:
+        pass
+
+
+class LocalBroadcast(BroadcastBackend):
+    """
+    Single-process stand-in: delivers straight to the local hub
+    """
+
+    async def publish(self, message: bytes) -> None:
+        self.deliver(message)
+
+
+def load_backend(path: str, deliver: Callable[[bytes], None]) -> BroadcastBackend:
+    """
+    Build the backend named by ``module:ClassName``, or LocalBroadcast when empty
+    """
+    if not path:
+        return LocalBroadcast(deliver)
+    module_name, _, class_name = path.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class(deliver)
+
+
+class EventHub:
+    """
+    Fans item events out to the subscribers of this worker
+    """
+
+    def __init__(self, buffer_size: int, backend_path: str = ""):
+        self.buffer_size = buffer_size
+        self.subscribers: Set[Subscriber] = set()
+        self.backend = load_backend(backend_path, self.deliver)
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start()
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+    async def publish(self, event_type: str, item_id: int, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Publish a change to every worker
+
+        Args:
+            event_type (str): created, updated, deleted or archived
+            item_id (int): Changed item
+            data (dict): Item fields (full item, or the changed fields only)
+        """
+        message = json.dumps(
+            {"type": event_type, "item_id": item_id, "data": data},
+            separators=(",", ":"),
+            default=str
+        ).encode()
+        try:
+            await self.backend.publish(message)
+        except Exception as exc:
+            # Live updates are best effort; the write itself already succeeded
+            logger.error(f"Failed to broadcast {event_type} event for item {item_id}: {exc}")
+
+    async def publish_many(self, event_type: str, changes: Iterable) -> None:
+        for item_id, data in changes:
+            await self.publish(event_type, item_id, data)
+
+    def deliver(self, message: bytes) -> None:
+        """
+        Hand a broadcast message to the local subscribers; safe to call from
+        a backend's own thread (subscribers are only touched on the event loop)
+        """
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is None or running is loop:
+            self._deliver(message)
+        else:
+            loop.call_soon_threadsafe(self._deliver, message)
+
+    def _deliver(self, message: bytes) -> None:
+        if not self.subscribers:
+            return
+        header = json.loads(message)
+        event = ItemEvent(
+            type=header["type"],
+            item_id=header["item_id"],
+            payload=message,
+            sse=b"event: " + header["type"].encode() + b"\ndata: " + message + b"\n\n"
+        )
+        for subscriber in list(self.subscribers):
+            if subscriber.item_ids is not None and event.item_id not in subscriber.item_ids:
+                continue
+            if not subscriber.push(event, self.buffer_size):
+                self.subscribers.discard(subscriber)
+                self.dropped += 1
+                logger.warning("Dropped slow event subscriber")
+
+    def subscribe(self, item_ids: Optional[Set[int]] = None) -> Subscriber:
+        subscriber = Subscriber(item_ids)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+
+item_events = EventHub(
+    buffer_size=settings.EVENT_SUBSCRIBER_BUFFER,
+    backend_path=settings.EVENT_BROADCAST_BACKEND
+)
@@ -0,0 +1,47 @@
+"""
+Pre-encoded OpenAPI document for Kaivora API
+"""
+
+import json
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+
+def setup_static_openapi(app: FastAPI) -> None:
+    """
+    Serve the OpenAPI document from bytes encoded once, instead of
+    re-serializing the schema on every request.
+
+    Must be called after all routers are included.
+
+    Args:
+        app (FastAPI): FastAPI application instance
+    """
+
+    openapi_url = app.openapi_url
+    if not openapi_url:
+        return
+
+    app.router.routes = [
+        route for route in app.router.routes
+        if getattr(route, "path", None) != openapi_url
+    ]
+
+    schema = app.openapi()
+    body = json.dumps(schema, separators=(",", ":")).encode()
+
+    async def openapi(req: Request) -> Response:
+        root_path = req.scope.get("root_path", "").rstrip("/")
+        if root_path and app.root_path_in_servers:
+            # Mounted under a prefix: include it as a server entry, as FastAPI does
+            servers = schema.get("servers", [])
+            if root_path not in {server.get("url") for server in servers}:
+                return JSONResponse({**schema, "servers": [{"url": root_path}] + servers})
+        return Response(content=body, media_type="application/json")
+
+    app.add_route(openapi_url, openapi, include_in_schema=False)
+    logger.info(f"OpenAPI document pre-encoded ({len(body)} bytes)")
@@ -0,0 +1,25 @@
+"""
+Route identification shared by the profiling and traffic capture middleware
+"""
+
+from starlette.types import Scope
+
+
+def route_label(scope: Scope) -> str:
+    """
+    ``METHOD /path/{template}`` of the matched route
+    """
+    method = scope.get("method", "")
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return f"{method} (unrouted)"
+    path = scope.get("path", "")
+    regex = getattr(route, "path_regex", None)
+    if regex is not None and not regex.match(path):
+        # Route of an included router: recover the prefix it is mounted under
+        for index in range(1, len(path)):
+            if path[index] == "/" and regex.match(path[index:]):
+                template = path[:index] + template
+                break
+    return f"{method} {template}"
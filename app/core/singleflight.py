@@ -0,0 +1,50 @@
+"""
+Request coalescing ("single-flight") for Kaivora API
+
+Concurrent callers asking for the same key share one in-flight call instead
+of each issuing the same query. Only calls that overlap in time are shared;
+nothing is cached once the call finishes.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async calls by key
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` for ``key``, or wait for the call already in flight for it
+
+        The call runs as its own task, so a caller that is cancelled (client
+        disconnect) does not cancel the result the other callers wait for.
+
+        Args:
+            key (Hashable): Identity of the call
+            fn (Callable): Coroutine factory performing the work
+
+        Returns:
+            Any: Result of the shared call (exceptions are shared too)
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
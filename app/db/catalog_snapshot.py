@@ -0,0 +1,278 @@
+"""
+In-memory columnar read model of the items table
+
+When ``CATALOG_SNAPSHOT_ENABLED`` is set (and NumPy is installed), each
+process keeps the catalog as parallel arrays, sorted by id: int64 ids,
+float64 prices, bool flags and datetime64 timestamps. Names and descriptions
+are kept in plain lists. ``list_items`` filters and sorts these arrays with
+vectorized operations, and only the returned page becomes response objects.
+
+The snapshot is kept current from the delta-sync feed (``updated_at``
+watermark plus tombstones). Like the listing it serves, it holds only the
+hot table, so archived items are dropped. A background task refreshes it
+every ``CATALOG_SNAPSHOT_REFRESH_INTERVAL`` seconds. A read that finds it
+older than ``CATALOG_SNAPSHOT_MAX_STALENESS`` seconds waits for a refresh
+first. The feed holds back the last ``CHANGE_FEED_SAFETY_LAG`` seconds of
+changes, so the snapshot trails the database by up to both; clients that
+just wrote are served from SQL.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.db.crud_items import ItemOrdering, Watermark, get_item_changes
+from app.db.session import SessionLocal
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 10000
+
+# (price, is_active, created_at, updated_at, name, description)
+Row = Tuple[float, bool, Optional[datetime], Optional[datetime], str, Optional[str]]
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class CatalogSnapshot:
+    """
+    Immutable set of columns; a refresh builds a new snapshot
+    """
+
+    __slots__ = (
+        "ids", "prices", "active", "created_at", "updated_at",
+        "names", "descriptions", "aware", "watermark", "loaded_at"
+    )
+
+    def __init__(self, ids, prices, active, created_at, updated_at, names, descriptions,
+                 aware: bool, watermark: Optional[Watermark], loaded_at: float):
+        self.ids = ids
+        self.prices = prices
+        self.active = active
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.names = names
+        self.descriptions = descriptions
+        self.aware = aware
+        self.watermark = watermark
+        self.loaded_at = loaded_at
+
+    @classmethod
+    def empty(cls) -> "CatalogSnapshot":
+        return cls(
+            np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.bool_),
+            np.empty(0, "datetime64[us]"), np.empty(0, "datetime64[us]"), [], [],
+            aware=False, watermark=None, loaded_at=0.0
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the snapshot
+        """
+        arrays = sum(column.nbytes for column in (self.ids, self.prices, self.active, self.created_at, self.updated_at))
+        strings = sum(sys.getsizeof(value) for value in self.names)
+        strings += sum(sys.getsizeof(value) for value in self.descriptions if value is not None)
+        return arrays + strings + sys.getsizeof(self.names) + sys.getsizeof(self.descriptions)
+
+    def merged(self, upserts: Dict[int, Row], deleted: Set[int],
+               watermark: Optional[Watermark], loaded_at: float) -> "CatalogSnapshot":
+        """
+        New snapshot with rows upserted and ids removed
+        """
+        if not upserts and not deleted:
+            return CatalogSnapshot(
+                self.ids, self.prices, self.active, self.created_at, self.updated_at,
+                self.names, self.descriptions, self.aware, watermark or self.watermark, loaded_at
+            )
+
+        ids, prices, active = self.ids, self.prices, self.active
+        created_at, updated_at = self.created_at, self.updated_at
+        names, descriptions = self.names, self.descriptions
+
+        removed = set(deleted) | set(upserts)
+        if removed and len(ids):
+            keep = ~np.isin(ids, np.fromiter(removed, np.int64, len(removed)))
+            if not keep.all():
+                ids, prices, active = ids[keep], prices[keep], active[keep]
+                created_at, updated_at = created_at[keep], updated_at[keep]
+                positions = np.flatnonzero(keep)
+                names = [names[i] for i in positions]
+                descriptions = [descriptions[i] for i in positions]
+
+        aware = self.aware
+        if upserts:
+            new_ids = np.fromiter(upserts, np.int64, len(upserts))
+            rows = list(upserts.values())
+            aware = aware or any(row[3] is not None and row[3].tzinfo is not None for row in rows)
+            ids = np.concatenate([ids, new_ids])
+            prices = np.concatenate([prices, np.fromiter((row[0] for row in rows), np.float64, len(rows))])
+            active = np.concatenate([active, np.fromiter((row[1] for row in rows), np.bool_, len(rows))])
+            created_at = np.concatenate([created_at, np.array([_naive_utc(row[2]) for row in rows], "datetime64[us]")])
+            updated_at = np.concatenate([updated_at, np.array([_naive_utc(row[3]) for row in rows], "datetime64[us]")])
+            names = names + [row[4] for row in rows]
+            descriptions = descriptions + [row[5] for row in rows]
+
+            if len(ids) > 1 and not (ids[1:] > ids[:-1]).all():
+                order = np.argsort(ids, kind="stable")
+                ids, prices, active = ids[order], prices[order], active[order]
+                created_at, updated_at = created_at[order], updated_at[order]
+                names = [names[i] for i in order]
+                descriptions = [descriptions[i] for i in order]
+
+        return CatalogSnapshot(
+            ids, prices, active, created_at, updated_at, names, descriptions,
+            aware, watermark or self.watermark, loaded_at
+        )
+
+    def query(self, skip: int, limit: int, min_price: Optional[float] = None, max_price: Optional[float] = None,
+              is_active: Optional[bool] = None, order_by: ItemOrdering = "id") -> List[Dict[str, Any]]:
+        """
+        Filter and sort with vectorized operations; materialize only the page.
+        Orders like ``query_items``: ties by id, missing timestamps last.
+        """
+        mask = np.ones(len(self.ids), np.bool_)
+        if min_price is not None:
+            mask &= self.prices >= min_price
+        if max_price is not None:
+            mask &= self.prices <= max_price
+        if is_active is not None:
+            mask &= self.active == is_active
+        positions = np.flatnonzero(mask)
+
+        if order_by != "id":
+            column = self.prices if order_by.lstrip("-") == "price" else self.updated_at
+            positions = positions[_sort_order(column[positions], self.ids[positions], order_by.startswith("-"))]
+
+        return [self._row(position) for position in positions[skip:skip + limit]]
+
+    def _row(self, position: int) -> Dict[str, Any]:
+        return {
+            "id": int(self.ids[position]),
+            "name": self.names[position],
+            "description": self.descriptions[position],
+            "price": float(self.prices[position]),
+            "is_active": bool(self.active[position]),
+            "created_at": self._datetime(self.created_at[position]),
+            "updated_at": self._datetime(self.updated_at[position])
+        }
+
+    def _datetime(self, value) -> Optional[datetime]:
+        result = value.item()
+        if result is not None and self.aware:
+            result = result.replace(tzinfo=timezone.utc)
+        return result
+
+
+def _sort_order(keys, ids, descending: bool):
+    """
+    Positions sorting ``keys`` (NaT last in both directions), ties by ascending id
+    """
+    if keys.dtype.kind == "M":
+        missing = np.isnat(keys)
+        # NaT is the minimum int64: zero it before negating, so it cannot overflow
+        keys = np.where(missing, 0, keys.astype(np.int64))
+    else:
+        missing = np.zeros(len(keys), np.bool_)
+    if descending:
+        keys = -keys
+    return np.lexsort((ids, keys, missing))
+
+
+class CatalogReadModel:
+    """
+    Holds the current snapshot and keeps it within the staleness bound
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_staleness: float,
+                 feed_lag: float = settings.CHANGE_FEED_SAFETY_LAG):
+        self.session_factory = session_factory
+        self.max_staleness = max_staleness
+        self.feed_lag = feed_lag
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._flight = SingleFlight()
+
+    async def current(self) -> CatalogSnapshot:
+        snapshot = self.snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > self.max_staleness:
+            await self.refresh()
+        return self.snapshot
+
+    async def refresh(self) -> None:
+        # Concurrent readers share one refresh
+        await self._flight.do("refresh", lambda: run_in_threadpool(self._refresh))
+
+    def _refresh(self) -> None:
+        started = time.monotonic()
+        base = self.snapshot or CatalogSnapshot.empty()
+        watermark = base.watermark
+        upserts: Dict[int, Row] = {}
+        deleted: Set[int] = set()
+
+        db = self.session_factory()
+        try:
+            has_more = True
+            while has_more:
+                items, deleted_ids, archived_ids, page_watermark, has_more = get_item_changes(
+                    db, watermark, PAGE_SIZE, lag=self.feed_lag
+                )
+                # An id deleted (or archived) and written again exists now: apply removals first
+                for item_id in deleted_ids + archived_ids:
+                    upserts.pop(item_id, None)
+                    deleted.add(item_id)
+                for item in items:
+                    deleted.discard(item.id)
+                    upserts[item.id] = (
+                        item.price, item.is_active, item.created_at, item.updated_at, item.name, item.description
+                    )
+                watermark = page_watermark or watermark
+                db.expunge_all()
+        finally:
+            db.close()
+
+        self.snapshot = base.merged(upserts, deleted, watermark, started)
+        if upserts or deleted:
+            logger.info(f"Catalog snapshot refreshed: {len(upserts)} upserts, {len(deleted)} deletions, "
+                        f"{len(self.snapshot)} items")
+
+
+async def refresh_catalog_periodically(read_model: CatalogReadModel, interval: float) -> None:
+    """
+    Background task: keep the snapshot fresh so reads rarely wait
+    """
+    while True:
+        try:
+            await read_model.refresh()
+        except Exception as exc:
+            logger.error(f"Catalog snapshot refresh failed: {type(exc).__name__} - {exc}")
+        await asyncio.sleep(interval)
+
+
+def _build_read_model() -> Optional[CatalogReadModel]:
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        return None
+    if np is None:
+        logger.warning("CATALOG_SNAPSHOT_ENABLED is set but NumPy is not installed; serving from the database")
+        return None
+    return CatalogReadModel(SessionLocal, settings.CATALOG_SNAPSHOT_MAX_STALENESS)
+
+
+catalog_read_model = _build_read_model()
@@ -0,0 +1,191 @@
+# app/db/crud_items.py
+
+import asyncio
+import base64
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Literal, Optional, Tuple, Union
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import ArchivedItem, Item, ItemTombstone, utcnow
+
+logger = logging.getLogger(__name__)
+
+# Ordering key of the change feed: (timestamp, item id, kind)
+TOMBSTONE, UPSERT, ARCHIVE = 0, 1, 2
+Watermark = Tuple[datetime, int, int]
+
+# Sort keys of item listings; prefix with - for descending
+ItemOrdering = Literal["id", "price", "-price", "updated_at", "-updated_at"]
+
+
+def get_items_by_ids(db: Session, ids: Iterable[int]) -> Dict[int, Union[Item, ArchivedItem]]:
+    """
+    Fetch many items with a single IN query, keyed by id; ids not in the
+    hot table are looked up in the archive with a second query
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+    found: Dict[int, Union[Item, ArchivedItem]] = {
+        item.id: item for item in db.query(Item).filter(Item.id.in_(ids)).all()
+    }
+    missing = [item_id for item_id in ids if item_id not in found]
+    if missing:
+        found.update({item.id: item for item in db.query(ArchivedItem).filter(ArchivedItem.id.in_(missing)).all()})
+    return found
+
+
+def query_items(
+    db: Session,
+    skip: int,
+    limit: int,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_active: Optional[bool] = None,
+    order_by: ItemOrdering = "id"
+) -> List[Item]:
+    """
+    One page of the hot catalog, filtered and sorted; ties (and missing
+    timestamps, which sort last) are broken by id
+    """
+    query = db.query(Item)
+    if min_price is not None:
+        query = query.filter(Item.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Item.price <= max_price)
+    if is_active is not None:
+        query = query.filter(Item.is_active.is_(is_active))
+    if order_by != "id":
+        column = Item.price if order_by.lstrip("-") == "price" else Item.updated_at
+        query = query.order_by((column.desc() if order_by.startswith("-") else column.asc()).nulls_last())
+    return query.order_by(Item.id).offset(skip).limit(limit).all()
+
+
+def encode_watermark(watermark: Watermark) -> str:
+    timestamp, item_id, kind = watermark
+    raw = f"{timestamp.isoformat()}|{item_id}|{kind}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_watermark(token: str) -> Watermark:
+    """
+    Parse an opaque watermark; raises ValueError (-> 400) when malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        timestamp, item_id, kind = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(item_id), int(kind)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid watermark: {token!r}")
+
+
+def watermark_expired(since: Watermark, retention_days: float = settings.ITEM_TOMBSTONE_RETENTION_DAYS,
+                      now: Optional[datetime] = None) -> bool:
+    """
+    Whether deletions after ``since`` may already have been purged, so the
+    client must resync from scratch
+    """
+    timestamp = since[0]
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp < (now or utcnow()) - timedelta(days=retention_days)
+
+
+def _after(timestamp_column, id_column, kind: int, since: Watermark):
+    since_timestamp, since_id, since_kind = since
+    same_timestamp = id_column > since_id if kind <= since_kind else id_column >= since_id
+    return or_(timestamp_column > since_timestamp, and_(timestamp_column == since_timestamp, same_timestamp))
+
+
+def get_item_changes(
+    db: Session,
+    since: Optional[Watermark],
+    limit: int,
+    lag: float = settings.CHANGE_FEED_SAFETY_LAG,
+    now: Optional[datetime] = None
+) -> Tuple[List[Item], List[int], List[int], Optional[Watermark], bool]:
+    """
+    Items upserted, ids deleted and ids archived after a watermark, oldest first.
+
+    The three tables are read through their timestamp indexes with keyset
+    pagination, then merged by (timestamp, id, kind).
+
+    Timestamps come from the application clock when the row is written, not
+    when its transaction commits. Changes newer than ``lag`` seconds are held
+    back, so a transaction that commits within ``lag`` of its timestamp is
+    never skipped by a watermark that has already moved past it.
+
+    Returns:
+        Tuple: changed items, deleted ids, archived ids, watermark of the last
+        change returned (None when nothing changed), and whether more changes remain
+    """
+    cutoff = (now or utcnow()) - timedelta(seconds=lag)
+    items_query = db.query(Item).filter(Item.updated_at <= cutoff)
+    tombstones_query = db.query(ItemTombstone.item_id, ItemTombstone.deleted_at).filter(
+        ItemTombstone.deleted_at <= cutoff
+    )
+    archive_query = db.query(ArchivedItem.id, ArchivedItem.archived_at).filter(ArchivedItem.archived_at <= cutoff)
+    if since is not None:
+        items_query = items_query.filter(_after(Item.updated_at, Item.id, UPSERT, since))
+        tombstones_query = tombstones_query.filter(
+            _after(ItemTombstone.deleted_at, ItemTombstone.item_id, TOMBSTONE, since)
+        )
+        archive_query = archive_query.filter(_after(ArchivedItem.archived_at, ArchivedItem.id, ARCHIVE, since))
+
+    items = items_query.order_by(Item.updated_at, Item.id).limit(limit + 1).all()
+    tombstones = tombstones_query.order_by(ItemTombstone.deleted_at, ItemTombstone.item_id).limit(limit + 1).all()
+    archived = archive_query.order_by(ArchivedItem.archived_at, ArchivedItem.id).limit(limit + 1).all()
+
+    changes = sorted(
+        [((item.updated_at, item.id, UPSERT), item) for item in items]
+        + [((deleted_at, item_id, TOMBSTONE), None) for item_id, deleted_at in tombstones]
+        + [((archived_at, item_id, ARCHIVE), None) for item_id, archived_at in archived],
+        key=lambda change: change[0]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    changed = [item for _, item in changes if item is not None]
+    deleted = [key[1] for key, _ in changes if key[2] == TOMBSTONE]
+    archived_ids = [key[1] for key, _ in changes if key[2] == ARCHIVE]
+    watermark = changes[-1][0] if changes else None
+    return changed, deleted, archived_ids, watermark, has_more
+
+
+def purge_tombstones(db: Session, retention_days: float = settings.ITEM_TOMBSTONE_RETENTION_DAYS) -> int:
+    """
+    Delete tombstones older than the retention; returns how many were removed
+    """
+    removed = db.execute(
+        delete(ItemTombstone)
+        .where(ItemTombstone.deleted_at < utcnow() - timedelta(days=retention_days))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return removed
+
+
+async def purge_tombstones_periodically(session_factory, interval: float) -> None:
+    """
+    Background task: delete expired tombstones every ``interval`` seconds
+    """
+    def purge() -> int:
+        db = session_factory()
+        try:
+            return purge_tombstones(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await run_in_threadpool(purge)
+        except Exception as exc:
+            logger.error(f"Tombstone purge failed: {type(exc).__name__} - {exc}")
+        else:
+            if removed:
+                logger.info(f"Purged {removed} item tombstones")
@@ -0,0 +1,109 @@
+# app/db/crud_tokens.py
+
+import asyncio
+import logging
+import secrets
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from app.core.auth import create_refresh_token, hash_refresh_token
+from app.core.config import settings
+from app.db.models import RefreshToken, utcnow
+
+logger = logging.getLogger(__name__)
+
+def issue_refresh_token(db: Session, user_id: int, subject: str, family_id: Optional[str] = None) -> str:
+    """
+    Store a new refresh token (its HMAC only) and return the token itself
+    """
+    token = create_refresh_token()
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user_id,
+        subject=subject,
+        expires_at=utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    db.commit()
+    return token
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[str, str]]:
+    """
+    Exchange a refresh token for a new one in the same family.
+
+    A token can be used once. Presenting an already used token means it
+    leaked, so the whole family is revoked.
+
+    Returns:
+        (new refresh token, subject), or None if the token is unknown,
+        expired or reused
+    """
+    stored = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token)).first()
+    if stored is None:
+        return None
+
+    # Conditional update: of two concurrent rotations only one can win
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == stored.id,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.expires_at > utcnow()
+        )
+        .values(used_at=utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        db.refresh(stored)
+        if stored.used_at is not None:
+            revoke_refresh_token_family(db, stored.family_id)
+        return None
+
+    new_token = issue_refresh_token(db, stored.user_id, stored.subject, stored.family_id)
+    return new_token, stored.subject
+
+def revoke_refresh_token_family(db: Session, family_id: str) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.used_at.is_(None))
+        .values(used_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def sweep_expired_refresh_tokens(db: Session) -> int:
+    """
+    Delete expired refresh tokens; returns how many were removed
+    """
+    removed = db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at <= utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return removed
+
+async def sweep_refresh_tokens_periodically(session_factory, interval: float) -> None:
+    """
+    Background task: delete expired refresh tokens every ``interval`` seconds
+    """
+    def sweep() -> int:
+        db = session_factory()
+        try:
+            return sweep_expired_refresh_tokens(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await run_in_threadpool(sweep)
+        except Exception as exc:
+            logger.error(f"Refresh token sweep failed: {type(exc).__name__} - {exc}")
+        else:
+            if removed:
+                logger.info(f"Swept {removed} expired refresh tokens")
@@ -1,9 +1,14 @@
 # app/db/crud_users.py
 
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.db.models import User
 from app.models.user import UserCreate
-from app.core.auth import hash_password
+from app.core.auth import hash_password, hash_passwords
 
 def get_user_by_username(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
@@ -22,3 +27,82 @@ def create_user(db: Session, user: UserCreate):
     db.commit()
     db.refresh(db_user)
     return db_user
+
+# 📦 Importação em massa: unicidade checada em lote, hashes em paralelo, inserts em blocos
+def bulk_create_users(db: Session, rows: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Create many users, yielding one result per input row (in input order)
+
+    Each chunk costs two uniqueness queries (usernames, emails), one parallel
+    hashing pass and one bulk INSERT. If the INSERT hits a unique constraint
+    (a concurrent registration), that chunk is retried row by row.
+    """
+    for start, chunk in _chunks(rows, chunk_size):
+        results: List[Optional[Dict[str, Any]]] = [None] * len(chunk)
+        valid: List[Tuple[int, UserCreate]] = []
+        for offset, row in enumerate(chunk):
+            try:
+                user = UserCreate.model_validate(row)
+            except ValidationError as exc:
+                results[offset] = _result(start + offset, row, "invalid", exc.errors()[0]["msg"])
+                continue
+            valid.append((offset, user))
+
+        usernames = [user.username for _, user in valid]
+        emails = [user.email for _, user in valid]
+        taken_usernames = {u for (u,) in db.query(User.username).filter(User.username.in_(usernames))}
+        taken_emails = {e for (e,) in db.query(User.email).filter(User.email.in_(emails))}
+
+        to_create: List[Tuple[int, UserCreate]] = []
+        for offset, user in valid:
+            if user.username in taken_usernames:
+                results[offset] = _result(start + offset, user, "duplicate", "Username already registered")
+            elif user.email in taken_emails:
+                results[offset] = _result(start + offset, user, "duplicate", "Email already registered")
+            else:
+                taken_usernames.add(user.username)
+                taken_emails.add(user.email)
+                to_create.append((offset, user))
+
+        hashes = hash_passwords([user.password for _, user in to_create])
+        records = [
+            {"username": user.username, "email": user.email, "hashed_password": hashed}
+            for (_, user), hashed in zip(to_create, hashes)
+        ]
+        try:
+            if records:
+                db.execute(insert(User), records)
+            db.commit()
+            for offset, user in to_create:
+                results[offset] = _result(start + offset, user, "created")
+        except IntegrityError:
+            db.rollback()
+            for (offset, user), record in zip(to_create, records):
+                try:
+                    db.execute(insert(User), [record])
+                    db.commit()
+                    results[offset] = _result(start + offset, user, "created")
+                except IntegrityError:
+                    db.rollback()
+                    results[offset] = _result(start + offset, user, "duplicate", "Username or email already registered")
+
+        yield from results
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    chunk: List[Dict[str, Any]] = []
+    start = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield start, chunk
+            start += size
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+def _result(row: int, user: Any, status: str, detail: Optional[str] = None) -> Dict[str, Any]:
+    username = user.username if isinstance(user, UserCreate) else (user.get("username") if isinstance(user, dict) else None)
+    result = {"row": row, "username": username, "status": status}
+    if detail:
+        result["detail"] = detail
+    return result
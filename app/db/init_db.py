@@ -2,15 +2,67 @@
 Database initialization script
 """
 
-from app.db.base import engine, Base
-from app.db.models import Item, User
+from sqlalchemy import func, select, text, update
+from app.db.base import Base
+from app.db.session import engine
+from app.db.models import ArchivedItem, Item, ItemTombstone, User
 
 def init_database():
     """
     Create all database tables
     """
     Base.metadata.create_all(bind=engine)
+    upgrade_items_table()
+    upgrade_item_ids()
     print("Database tables created successfully!")
 
+def upgrade_items_table():
+    """
+    Bring an existing items table up to date for delta sync: create the
+    updated_at index and give never-updated rows their creation time.
+    """
+    for index in Item.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(
+            update(Item.__table__)
+            .where(Item.__table__.c.updated_at.is_(None))
+            .values(updated_at=Item.__table__.c.created_at)
+        )
+
+def upgrade_item_ids():
+    """
+    SQLite only: rebuild an items table created without AUTOINCREMENT (SQLite
+    would otherwise hand the highest id out again once that item is archived)
+    and start new ids past every archived id.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        table_sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'items'")
+        ).scalar()
+        if "AUTOINCREMENT" not in table_sql.upper():
+            conn.execute(text("ALTER TABLE items RENAME TO items_old"))
+            index_names = conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'items_old' AND sql IS NOT NULL"
+            )).scalars().all()
+            for name in index_names:
+                conn.execute(text(f'DROP INDEX "{name}"'))
+            Item.__table__.create(bind=conn)
+            columns = ", ".join(column.name for column in Item.__table__.c)
+            conn.execute(text(f"INSERT INTO items ({columns}) SELECT {columns} FROM items_old"))
+            conn.execute(text("DROP TABLE items_old"))
+            print("Rebuilt items table with AUTOINCREMENT ids")
+
+        top = max(
+            conn.execute(select(func.max(Item.__table__.c.id))).scalar() or 0,
+            conn.execute(select(func.max(ArchivedItem.__table__.c.id))).scalar() or 0
+        )
+        sequence = conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'items'")).scalar()
+        if sequence is None or sequence < top:
+            conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'items'"))
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('items', :top)"), {"top": top})
+
 if __name__ == "__main__":
-    init_database()
\ No newline at end of file
+    init_database()
@@ -0,0 +1,160 @@
+"""
+Hot/cold tiering of the items table
+
+A background job moves items out of ``items`` into ``items_archive`` in
+batches. It takes inactive items not updated for
+``ITEM_ARCHIVE_INACTIVE_AFTER_DAYS`` days, and, when
+``ITEM_ARCHIVE_MAX_AGE_DAYS`` is set, any item not updated for that long.
+The hot table and its indexes then hold only the live catalog, which is
+all that listings read.
+
+Each batch is one transaction. Rows are removed with DELETE ... RETURNING
+(re-checking the predicate) and the returned rows are inserted into the
+archive, so an item is in exactly one table even if it is reactivated
+while the job runs. Item ids are never reused (AUTOINCREMENT on SQLite),
+so a new item cannot take the id of an archived one.
+
+Reads by id fall through to the archive. Updating an archived item first
+restores it to the hot table. The change feed reports archived ids
+separately, so mirrors of the hot catalog can drop them.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.events import ARCHIVED, item_events
+from app.db.models import ArchivedItem, Item, utcnow
+
+logger = logging.getLogger(__name__)
+
+HOT = Item.__table__
+COLD = ArchivedItem.__table__
+
+
+def archive_predicate(now: datetime, inactive_after_days: float, max_age_days: float):
+    """
+    Rows of the hot table that belong in the archive
+    """
+    predicate = and_(HOT.c.is_active.is_(False), HOT.c.updated_at < now - timedelta(days=inactive_after_days))
+    if max_age_days > 0:
+        predicate = or_(predicate, HOT.c.updated_at < now - timedelta(days=max_age_days))
+    return predicate
+
+
+def archive_batch(
+    db: Session,
+    batch_size: int,
+    inactive_after_days: float = settings.ITEM_ARCHIVE_INACTIVE_AFTER_DAYS,
+    max_age_days: float = settings.ITEM_ARCHIVE_MAX_AGE_DAYS,
+    now: Optional[datetime] = None
+) -> List[int]:
+    """
+    Move one batch of items to the archive
+
+    Args:
+        db (Session): Session on the primary
+        batch_size (int): Maximum items moved in this transaction
+
+    Returns:
+        List[int]: IDs of the archived items
+    """
+    predicate = archive_predicate(now or utcnow(), inactive_after_days, max_age_days)
+    # Oldest first, through the updated_at index
+    ids = db.execute(select(HOT.c.id).where(predicate).order_by(HOT.c.updated_at).limit(batch_size)).scalars().all()
+    if not ids:
+        return []
+
+    try:
+        rows = db.execute(delete(HOT).where(HOT.c.id.in_(ids), predicate).returning(*HOT.c)).mappings().all()
+        if rows:
+            archived_at = utcnow()
+            db.execute(insert(COLD), [dict(row, archived_at=archived_at) for row in rows])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return [row["id"] for row in rows]
+
+
+def restore_items(db: Session, ids: Iterable[int]) -> List[Row]:
+    """
+    Move archived items back to the hot table (the caller commits)
+
+    Restored rows get a fresh ``updated_at`` so they re-enter the change feed.
+
+    Returns:
+        List[Row]: The restored rows; ids not in the archive are skipped
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    rows = db.execute(delete(COLD).where(COLD.c.id.in_(ids)).returning(*COLD.c)).all()
+    if rows:
+        restored_at = utcnow()
+        db.execute(insert(HOT), [
+            {**{column.name: getattr(row, column.name) for column in HOT.c}, "updated_at": restored_at}
+            for row in rows
+        ])
+        logger.info(f"Restored {len(rows)} items from the archive")
+    return rows
+
+
+def restore_item(db: Session, item_id: int) -> Optional[Item]:
+    """
+    Bring one archived item back to the hot table, loaded as an Item
+    """
+    if not restore_items(db, [item_id]):
+        return None
+    return db.get(Item, item_id)
+
+
+def _archive_batch(session_factory: Callable[[], Session], batch_size: int) -> List[int]:
+    db = session_factory()
+    try:
+        return archive_batch(db, batch_size)
+    finally:
+        db.close()
+
+
+async def archive_items(session_factory: Callable[[], Session], batch_size: int, pause: float) -> int:
+    """
+    Archive every eligible item, one batch per transaction with a pause
+    between batches so writers are never blocked for long
+
+    Returns:
+        int: Number of items archived
+    """
+    total = 0
+    while True:
+        ids = await run_in_threadpool(_archive_batch, session_factory, batch_size)
+        if ids:
+            total += len(ids)
+            await item_events.publish_many(ARCHIVED, ((item_id, None) for item_id in ids))
+        if len(ids) < batch_size:
+            return total
+        await asyncio.sleep(pause)
+
+
+async def archive_items_periodically(session_factory: Callable[[], Session], interval: float) -> None:
+    """
+    Background task: run the archival job every ``interval`` seconds
+    """
+    while True:
+        try:
+            started = asyncio.get_running_loop().time()
+            archived = await archive_items(
+                session_factory, settings.ITEM_ARCHIVE_BATCH_SIZE, settings.ITEM_ARCHIVE_BATCH_PAUSE
+            )
+            if archived:
+                elapsed = asyncio.get_running_loop().time() - started
+                logger.info(f"Archived {archived} items in {elapsed:.1f}s")
+        except Exception as exc:
+            logger.error(f"Item archival failed: {type(exc).__name__} - {exc}")
+        await asyncio.sleep(interval)
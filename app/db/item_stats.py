@@ -0,0 +1,256 @@
+"""
+Incrementally maintained item statistics
+
+Item writes report (before, after) snapshots of the changed row and the
+aggregates are adjusted in O(1), so ``GET /api/v1/items/stats`` never scans
+the table. Every process keeps its own aggregates; a periodic reconcile
+against SQL ``GROUP BY`` queries corrects drift and picks up writes made by
+other workers.
+
+Price figures (min, max, average, histogram) cover active items only.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import ArchivedItem, Item
+
+logger = logging.getLogger(__name__)
+
+
+class ItemFacts(NamedTuple):
+    """The fields of one item that statistics depend on"""
+    price: float
+    is_active: bool
+    created_on: Optional[date]
+
+
+def item_facts(item: Any) -> ItemFacts:
+    created_at = item.created_at
+    return ItemFacts(item.price, bool(item.is_active), created_at.date() if created_at else None)
+
+
+class ItemStats:
+    """
+    Running aggregates over the items table
+    """
+
+    def __init__(self, price_buckets: List[float]):
+        self.price_buckets = sorted(price_buckets)
+        self.ready = False
+        self.version = 0
+        self._encoded_version = -1
+        self._encoded: Dict[int, bytes] = {}  # days -> document, for _encoded_version
+        self._reset()
+
+    def _reset(self) -> None:
+        self.total = 0
+        self.active = 0
+        self.price_sum = 0.0
+        self.price_min: Optional[float] = None
+        self.price_max: Optional[float] = None
+        self.extremes_stale = False
+        self.histogram = [0] * (len(self.price_buckets) + 1)
+        self.created_per_day: Counter = Counter()
+        self.reconciled_at: Optional[datetime] = None
+
+    def _bucket(self, price: float) -> int:
+        return bisect.bisect_right(self.price_buckets, price)
+
+    def apply(self, before: Optional[ItemFacts], after: Optional[ItemFacts]) -> None:
+        """
+        Account for one item write: create (None, after), update (before,
+        after) or delete (before, None)
+        """
+        if not self.ready or before == after:
+            return
+        if before is not None:
+            self.total -= 1
+            if before.created_on:
+                self.created_per_day[before.created_on] -= 1
+            if before.is_active:
+                self.active -= 1
+                self.price_sum -= before.price
+                self.histogram[self._bucket(before.price)] -= 1
+                if before.price in (self.price_min, self.price_max):
+                    # Removing an extreme: the next one is unknown until a query
+                    self.extremes_stale = True
+        if after is not None:
+            self.total += 1
+            if after.created_on:
+                self.created_per_day[after.created_on] += 1
+            if after.is_active:
+                self.active += 1
+                self.price_sum += after.price
+                self.histogram[self._bucket(after.price)] += 1
+                if self.price_min is None or after.price < self.price_min:
+                    self.price_min = after.price
+                if self.price_max is None or after.price > self.price_max:
+                    self.price_max = after.price
+        self.version += 1
+
+    def load(self, db: Session) -> Dict[str, Any]:
+        """
+        Compute every aggregate with SQL GROUP BY queries (runs in a worker
+        thread). Archived items are included, so archival leaves the
+        statistics unchanged.
+        """
+        hot, cold = self._load_table(db, Item), self._load_table(db, ArchivedItem)
+        minimums = [value for value in (hot["price_min"], cold["price_min"]) if value is not None]
+        maximums = [value for value in (hot["price_max"], cold["price_max"]) if value is not None]
+        return {
+            "total": hot["total"] + cold["total"],
+            "active": hot["active"] + cold["active"],
+            "price_sum": hot["price_sum"] + cold["price_sum"],
+            "price_min": min(minimums) if minimums else None,
+            "price_max": max(maximums) if maximums else None,
+            "histogram": [a + b for a, b in zip(hot["histogram"], cold["histogram"])],
+            "created_per_day": hot["created_per_day"] + cold["created_per_day"]
+        }
+
+    def _load_table(self, db: Session, model) -> Dict[str, Any]:
+        bucket = case(
+            *[(model.price < edge, index) for index, edge in enumerate(self.price_buckets)],
+            else_=len(self.price_buckets)
+        )
+        total = db.query(func.count(model.id)).scalar()
+        active, price_sum, price_min, price_max = db.query(
+            func.count(model.id), func.sum(model.price), func.min(model.price), func.max(model.price)
+        ).filter(model.is_active.is_(True)).one()
+        histogram = dict(db.query(bucket, func.count(model.id)).filter(model.is_active.is_(True)).group_by(bucket))
+        day = func.date(model.created_at)
+        per_day = db.query(day, func.count(model.id)).filter(model.created_at.isnot(None)).group_by(day).all()
+        return {
+            "total": total,
+            "active": active,
+            "price_sum": price_sum or 0.0,
+            "price_min": price_min,
+            "price_max": price_max,
+            "histogram": [histogram.get(index, 0) for index in range(len(self.price_buckets) + 1)],
+            "created_per_day": Counter({
+                (value if isinstance(value, date) else date.fromisoformat(str(value))): count
+                for value, count in per_day
+            })
+        }
+
+    def install(self, aggregates: Dict[str, Any]) -> None:
+        """
+        Replace the running aggregates with freshly loaded ones (on the event loop)
+        """
+        self._reset()
+        for name, value in aggregates.items():
+            setattr(self, name, value)
+        self.reconciled_at = datetime.utcnow()
+        self.ready = True
+        self.version += 1
+
+    def load_extremes(self, db: Session):
+        rows = [
+            db.query(func.min(model.price), func.max(model.price)).filter(model.is_active.is_(True)).one()
+            for model in (Item, ArchivedItem)
+        ]
+        minimums = [row[0] for row in rows if row[0] is not None]
+        maximums = [row[1] for row in rows if row[1] is not None]
+        return (min(minimums) if minimums else None, max(maximums) if maximums else None)
+
+    def install_extremes(self, extremes) -> None:
+        self.price_min, self.price_max = extremes
+        self.extremes_stale = False
+        self.version += 1
+
+    def encoded(self, days: int) -> bytes:
+        """
+        JSON document of the current aggregates, re-encoded only after a change
+        (one cached document per ``days`` value)
+        """
+        if self._encoded_version != self.version:
+            self._encoded = {}
+            self._encoded_version = self.version
+        cached = self._encoded.get(days)
+        if cached is not None:
+            return cached
+
+        edges = self.price_buckets
+        histogram = [
+            {
+                "min": edges[index - 1] if index > 0 else None,
+                "max": edges[index] if index < len(edges) else None,
+                "count": count
+            }
+            for index, count in enumerate(self.histogram)
+        ]
+        recent_days = sorted(day for day, count in self.created_per_day.items() if count > 0)[-days:]
+        body = json.dumps({
+            "total_count": self.total,
+            "active_count": self.active,
+            "price_min": self.price_min,
+            "price_max": self.price_max,
+            "price_avg": round(self.price_sum / self.active, 2) if self.active else None,
+            "price_histogram": histogram,
+            "created_per_day": {day.isoformat(): self.created_per_day[day] for day in recent_days},
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None
+        }).encode()
+        self._encoded[days] = body
+        return body
+
+
+item_stats = ItemStats(settings.ITEM_STATS_PRICE_BUCKETS)
+
+
+def _with_session(session_factory: Callable[[], Session], fn: Callable[[Session], Any]) -> Any:
+    db = session_factory()
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+
+async def reconcile_item_stats(session_factory: Callable[[], Session]) -> None:
+    aggregates = await run_in_threadpool(_with_session, session_factory, item_stats.load)
+    item_stats.install(aggregates)
+
+
+async def _refresh_extremes(session_factory: Callable[[], Session]) -> None:
+    try:
+        extremes = await run_in_threadpool(_with_session, session_factory, item_stats.load_extremes)
+        item_stats.install_extremes(extremes)
+    except Exception as exc:
+        logger.error(f"Item stats min/max refresh failed: {type(exc).__name__} - {exc}")
+
+
+_background: set = set()
+
+
+async def ensure_item_stats(session_factory: Callable[[], Session]) -> ItemStats:
+    """
+    Load the aggregates on first use; afterwards serve from memory and refresh
+    min/max in the background when an extreme was removed
+    """
+    if not item_stats.ready:
+        await reconcile_item_stats(session_factory)
+    elif item_stats.extremes_stale and not _background:
+        task = asyncio.ensure_future(_refresh_extremes(session_factory))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+    return item_stats
+
+
+async def reconcile_item_stats_periodically(session_factory: Callable[[], Session], interval: float) -> None:
+    """
+    Background task: full reconcile every ``interval`` seconds
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_item_stats(session_factory)
+        except Exception as exc:
+            logger.error(f"Item stats reconcile failed: {type(exc).__name__} - {exc}")
@@ -1,11 +1,18 @@
 # app/db/models.py
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, LargeBinary
 from sqlalchemy.sql import func
 from app.db.base import Base
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 class Item(Base):
     __tablename__ = "items"
+    # Ids must never be reused: archived items keep theirs in items_archive
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, index=True)
@@ -13,7 +20,28 @@ class Item(Base):
     price = Column(Float, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too, so every row carries a change watermark for delta sync
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, index=True)
+
+class ArchivedItem(Base):
+    """Cold tier: items moved out of ``items`` by the archival job (app/db/item_archive.py)"""
+    __tablename__ = "items_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    description = Column(String(500), nullable=True)
+    price = Column(Float, nullable=False)
+    is_active = Column(Boolean, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), default=utcnow, nullable=False, index=True)
+
+class ItemTombstone(Base):
+    """Records deleted item ids so delta sync can report deletions"""
+    __tablename__ = "item_tombstones"
+
+    item_id = Column(Integer, primary_key=True)
+    deleted_at = Column(DateTime(timezone=True), default=utcnow, nullable=False, index=True)
 
 class User(Base):
     __tablename__ = "users"
@@ -23,3 +51,17 @@ class User(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
 
+class RefreshToken(Base):
+    """
+    Issued refresh token. Only the HMAC of the token is stored; tokens of one
+    login share a family so reuse of a rotated token revokes the whole chain.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    subject = Column(String(50), nullable=False)  # username, so renewals skip the users table
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)
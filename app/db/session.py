@@ -1,20 +1,206 @@
 # app/db/session.py
 
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
 from app.db.base import Base
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./kaivora.db"
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Scope key holding the client id issued to this request by ReadYourWritesMiddleware
+CLIENT_KEY_SCOPE = "kaivora.client_key"
+
+
+def _create_engine(url: str):
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(url, pool_pre_ping=True, connect_args=connect_args)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# 💧 Função para injetar a sessão do banco nas rotas
-def get_db():
+
+class Replica:
+    """
+    A read replica with its own engine, session factory and health state
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = _create_engine(url)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.checked_at = 0.0
+        self.active = 0
+
+    def ping(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except DBAPIError as exc:
+            logger.warning(f"Replica health check failed for {self.engine.url!r}: {exc}")
+            return False
+
+
+class ReplicaPool:
+    """
+    Selects a healthy replica per read session.
+
+    A background task re-probes the replicas with ``SELECT 1`` every
+    ``check_interval`` seconds; ``acquire`` only reads the last verdicts, so
+    an unreachable replica never delays a request. Unhealthy replicas are
+    skipped until a probe succeeds again.
+    """
+
+    def __init__(self, urls: List[str], strategy: str = "round_robin", check_interval: float = 10.0):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unknown replica selection strategy: {strategy}")
+        self.replicas = [Replica(url) for url in urls]
+        self.strategy = strategy
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def check_health(self) -> None:
+        """
+        Probe every replica (blocking; runs in a worker thread)
+        """
+        for replica in self.replicas:
+            healthy = replica.ping()
+            replica.checked_at = time.monotonic()
+            if healthy != replica.healthy:
+                logger.info(f"Replica {replica.engine.url!r} marked {'healthy' if healthy else 'unhealthy'}")
+            replica.healthy = healthy
+
+    async def monitor_health(self) -> None:
+        """
+        Background task: probe the replicas every ``check_interval`` seconds
+        """
+        while True:
+            try:
+                await run_in_threadpool(self.check_health)
+            except Exception as exc:
+                logger.error(f"Replica health check failed: {type(exc).__name__} - {exc}")
+            await asyncio.sleep(self.check_interval)
+
+    def acquire(self) -> Optional[Replica]:
+        """
+        Pick a healthy replica and count it as in use, or return None
+        """
+        with self._lock:
+            candidates = [replica for replica in self.replicas if replica.healthy]
+            if not candidates:
+                return None
+            if self.strategy == "least_connections":
+                replica = min(candidates, key=lambda r: r.active)
+            else:
+                replica = candidates[next(self._counter) % len(candidates)]
+            replica.active += 1
+            return replica
+
+    def release(self, replica: Replica) -> None:
+        with self._lock:
+            replica.active -= 1
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+
+class RecentWriters:
+    """
+    Remembers clients that wrote recently so their reads stay on the primary
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._last_write: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, client_key: Optional[str]) -> None:
+        if client_key is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[client_key] = now
+            # Sweep expired entries occasionally so the map stays small
+            if len(self._last_write) > 1024:
+                cutoff = now - self.window
+                self._last_write = {k: t for k, t in self._last_write.items() if t > cutoff}
+
+    def wrote_recently(self, client_key: Optional[str]) -> bool:
+        if client_key is None:
+            return False
+        last = self._last_write.get(client_key)
+        return last is not None and time.monotonic() - last < self.window
+
+
+replica_pool = ReplicaPool(
+    settings.DATABASE_REPLICA_URLS,
+    strategy=settings.REPLICA_SELECTION,
+    check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL
+) if settings.DATABASE_REPLICA_URLS else None
+recent_writers = RecentWriters(settings.READ_YOUR_WRITES_WINDOW)
+
+
+def client_key(request: Request) -> Optional[str]:
+    """
+    Identify the client for read-your-writes
+
+    The bearer token if present, else the client id cookie (issued on the
+    first write by ReadYourWritesMiddleware). The client address is never
+    used: behind a load balancer it is the same for every client. Returns
+    None for a client that cannot be told apart; its writes are not tracked.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return authorization
+    return request.scope.get(CLIENT_KEY_SCOPE) or request.cookies.get(settings.READ_YOUR_WRITES_COOKIE)
+
+
+# 💧 Função para injetar a sessão do banco nas rotas (primário)
+def get_db(request: Request):
     db = SessionLocal()
+    if request.method not in SAFE_METHODS:
+        # Read-your-writes applies once this request has actually committed something
+        key = client_key(request)
+        event.listen(db, "after_commit", lambda session: recent_writers.record(key))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# 📖 Sessão somente leitura: usa uma réplica, exceto logo após uma escrita do mesmo cliente
+def get_read_db(request: Request):
+    replica = None
+    if replica_pool is not None and not recent_writers.wrote_recently(client_key(request)):
+        replica = replica_pool.acquire()
+    if replica is None:
+        yield from get_db(request)
+        return
+
+    db = replica.SessionLocal()
     try:
         yield db
+    except DBAPIError as exc:
+        if exc.connection_invalidated:
+            replica_pool.mark_unhealthy(replica)
+        raise
     finally:
         db.close()
+        replica_pool.release(replica)
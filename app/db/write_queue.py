@@ -0,0 +1,205 @@
+"""
+Write-behind queue for high-rate item updates
+
+Deferred updates are coalesced per item id (later fields win) and flushed in
+one ``UPDATE items SET ... = CASE id ... END WHERE id IN (...)`` statement,
+either every ``flush_interval`` seconds or as soon as ``max_batch`` distinct
+items are pending. If the batched statement fails, the batch is retried one
+item per transaction, so a single bad row cannot drop the other updates.
+Delivery is at-most-once: a failed write is logged and reported only to
+callers that waited for the durability ack. The ack carries the ids that
+were updated and the ids whose write failed, so callers can tell a missing
+item from a committed or a lost write; events are published only for the
+updated ids.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.events import UPDATED, item_events
+from app.db.item_archive import restore_items
+from app.db.item_stats import ItemFacts, item_facts, item_stats
+from app.db.models import Item
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class FlushResult(NamedTuple):
+    """Outcome of one flushed batch, as delivered by the durability ack"""
+
+    updated: Set[int]
+    failed: Set[int]
+
+
+class ItemWriteQueue:
+    """
+    In-process queue of pending item updates, keyed by item id
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], flush_interval: float, max_batch: int):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._committed: Optional[asyncio.Future] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def enqueue(self, item_id: int, fields: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue an update for an item
+
+        Args:
+            item_id (int): Item to update
+            fields (Dict[str, Any]): Column values to set
+
+        Returns:
+            asyncio.Future: Resolves with a FlushResult once the batch holding
+            this update is written (the durability ack); an id in neither
+            set did not exist
+        """
+        loop = asyncio.get_running_loop()
+        self._pending.setdefault(item_id, {}).update(fields)
+        if self._committed is None:
+            self._committed = loop.create_future()
+            self._committed.add_done_callback(_retrieve_exception)
+        committed = self._committed
+
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._start_flush)
+        return committed
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> int:
+        """
+        Write every pending update in one transaction
+
+        Returns:
+            int: Number of items in the flushed batch
+        """
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+
+            batch, committed = self._pending, self._committed
+            self._pending, self._committed = {}, None
+            try:
+                updated, changes = await run_in_threadpool(self._write, batch)
+                failed: Set[int] = set()
+            except Exception as exc:
+                logger.error(f"Write-behind flush of {len(batch)} items failed: {type(exc).__name__} - {exc}")
+                updated, changes, failed = await run_in_threadpool(self._write_each, batch)
+                if not updated and len(failed) == len(batch):
+                    committed.set_exception(exc)
+                    return len(batch)
+
+            committed.set_result(FlushResult(updated, failed))
+            for before, after in changes:
+                item_stats.apply(before, after)
+            await item_events.publish_many(
+                UPDATED, ((item_id, fields) for item_id, fields in batch.items() if item_id in updated)
+            )
+            return len(batch)
+
+    def _write(self, batch: Dict[int, Dict[str, Any]]) -> Tuple[Set[int], List[Tuple[ItemFacts, ItemFacts]]]:
+        table = Item.__table__
+        columns = {column for fields in batch.values() for column in fields}
+        values = {
+            column: case(
+                {item_id: fields[column] for item_id, fields in batch.items() if column in fields},
+                value=table.c.id,
+                else_=table.c[column]
+            )
+            for column in columns
+        }
+
+        db = self.session_factory()
+        try:
+            # Previous values of the touched rows, for the incremental statistics
+            before = {
+                row.id: item_facts(row)
+                for row in db.execute(
+                    select(table.c.id, table.c.price, table.c.is_active, table.c.created_at)
+                    .where(table.c.id.in_(list(batch)))
+                )
+            }
+            # Archived items move back to the hot table when written to
+            restored = restore_items(db, [item_id for item_id in batch if item_id not in before])
+            before.update((row.id, item_facts(row)) for row in restored)
+            updated = set(db.execute(
+                update(table).where(table.c.id.in_(list(batch))).values(values).returning(table.c.id)
+            ).scalars())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if len(updated) != len(batch):
+            logger.warning(f"Write-behind flush matched {len(updated)} of {len(batch)} items")
+        logger.info(f"Write-behind flushed {len(updated)} items")
+        return updated, [(facts, facts._replace(**{
+            name: value for name, value in batch[item_id].items() if name in ("price", "is_active")
+        })) for item_id, facts in before.items() if item_id in updated]
+
+    def _write_each(
+        self, batch: Dict[int, Dict[str, Any]]
+    ) -> Tuple[Set[int], List[Tuple[ItemFacts, ItemFacts]], Set[int]]:
+        # Fallback after a failed batch: one transaction per item
+        updated: Set[int] = set()
+        changes: List[Tuple[ItemFacts, ItemFacts]] = []
+        failed: Set[int] = set()
+        if len(batch) == 1:
+            return updated, changes, set(batch)
+
+        for item_id, fields in batch.items():
+            try:
+                item_updated, item_changes = self._write({item_id: fields})
+            except Exception as exc:
+                logger.error(f"Write-behind update of item {item_id} failed: {type(exc).__name__} - {exc}")
+                failed.add(item_id)
+            else:
+                updated |= item_updated
+                changes.extend(item_changes)
+        return updated, changes, failed
+
+    async def close(self) -> None:
+        """
+        Flush whatever is still pending (called on shutdown)
+        """
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # Nobody may be waiting for the ack; avoid "exception was never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+item_write_queue = ItemWriteQueue(
+    SessionLocal,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+    max_batch=settings.WRITE_BEHIND_MAX_BATCH
+)
@@ -0,0 +1,249 @@
+"""
+Response compression middleware for Kaivora API
+
+Negotiates zstd, brotli or gzip from the Accept-Encoding header. brotli and
+zstd are used only when the optional ``brotli`` / ``zstandard`` packages are
+installed; gzip is always available. Compressed bodies of cacheable paths are
+kept in a small LRU so identical responses are not recompressed per request.
+The LRU is bounded by entry count and by total bytes, and a body larger than
+an eighth of the byte budget is not cached at all: a few large listing pages
+cannot take the whole budget.
+
+Every complete response of a compressible type carries ``Vary:
+Accept-Encoding``, compressed or not (too small, or the client accepts no
+supported encoding), so shared caches keep one copy per encoding. A strong
+``ETag`` gets the encoding appended when the body is compressed, because the
+compressed bytes differ from the original.
+"""
+
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def _build_compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors = {}
+    if zstandard is not None:
+        zstd_compressor = zstandard.ZstdCompressor(level=settings.ZSTD_LEVEL)
+        compressors["zstd"] = zstd_compressor.compress
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=settings.GZIP_LEVEL, mtime=0)
+    return compressors
+
+
+def negotiate_encoding(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Pick the best available encoding the client accepts
+
+    Args:
+        accept_encoding (str): Raw Accept-Encoding header value
+        available (List[str]): Server encodings in order of preference
+
+    Returns:
+        Optional[str]: Chosen encoding, or None to send the body as is
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies keyed by path, encoding and a digest of the raw body
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 8
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, str, bytes], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str, bytes]) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple[str, str, bytes], body: bytes) -> None:
+        if len(body) > self.max_entry_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = body
+        self.size += len(body)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete (single-message) responses.
+
+    Streaming responses are passed through untouched so event streams keep
+    flushing immediately.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        cacheable_paths: Tuple[str, ...] = (),
+        cache_size: int = 256,
+        cache_max_bytes: int = 32 * 1024 * 1024
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cacheable_paths = set(cacheable_paths)
+        self.compressors = _build_compressors()
+        self.cache = CompressedBodyCache(cache_size, cache_max_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # None still goes through the wrapper: the response needs Vary either way
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), list(self.compressors)
+        )
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if start_message is None:  # pragma: no cover - ASGI protocol violation
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._compressible(start_message):
+                await send(start_message)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None or len(body) < self.minimum_size:
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(scope, encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag is not None and etag.endswith('"') and not etag.startswith("W/"):
+                headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, start_message: Message) -> bool:
+        status_code = start_message["status"]
+        if status_code < 200 or status_code in (204, 304):
+            return False
+        headers = Headers(raw=start_message["headers"])
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, scope: Scope, encoding: str, body: bytes) -> bytes:
+        path = scope["path"]
+        if path not in self.cacheable_paths:
+            return self.compressors[encoding](body)
+
+        key = (path, encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self.compressors[encoding](body)
+            self.cache.put(key, compressed)
+        return compressed
+
+
+def setup_compression(app: FastAPI) -> None:
+    """
+    Setup response compression middleware for the FastAPI application
+
+    Args:
+        app (FastAPI): FastAPI application instance
+    """
+
+    if not settings.COMPRESSION_ENABLED:
+        logger.info("Response compression disabled")
+        return
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        cacheable_paths=tuple(settings.COMPRESSION_CACHE_PATHS),
+        cache_size=settings.COMPRESSION_CACHE_SIZE,
+        cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES
+    )
+
+    logger.info(
+        f"Response compression configured - encodings: {list(_build_compressors())}, "
+        f"minimum size: {settings.COMPRESSION_MINIMUM_SIZE} bytes"
+    )
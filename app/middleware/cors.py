@@ -41,7 +41,9 @@ def setup_cors(app: FastAPI) -> None:
             "Content-Length",
             "Content-Type",
             "X-Total-Count",
-            "X-Page-Count"
+            "X-Page-Count",
+            "X-Missing-Count",
+            "X-Missing-Ids"
         ]
     )
     
@@ -46,7 +46,7 @@ def setup_error_handlers(app: FastAPI) -> None:
         
         return JSONResponse(
             status_code=exc.status_code,
-            content=error_response.dict()
+            content=error_response.model_dump(mode="json")
         )
     
     @app.exception_handler(RequestValidationError)
@@ -86,7 +86,7 @@ def setup_error_handlers(app: FastAPI) -> None:
         
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            content=error_response.dict()
+            content=error_response.model_dump(mode="json")
         )
     
     @app.exception_handler(ValueError)
@@ -114,7 +114,7 @@ def setup_error_handlers(app: FastAPI) -> None:
         
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content=error_response.dict()
+            content=error_response.model_dump(mode="json")
         )
     
     @app.exception_handler(Exception)
@@ -143,7 +143,7 @@ def setup_error_handlers(app: FastAPI) -> None:
         
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content=error_response.dict()
+            content=error_response.model_dump(mode="json")
         )
     
     logger.info("Error handlers configured successfully")
@@ -0,0 +1,458 @@
+"""
+Sampling profiler for Kaivora API
+
+Opt-in with ``PROFILING_ENABLED``; when it is off the middleware is not
+installed and no sampler thread exists. A background thread reads every
+thread's current stack with ``sys._current_frames()``, so profiled code
+runs unmodified.
+
+Two modes:
+
+* Per-request: send ``X-Profile: html`` (or ``speedscope``), or the query
+  flag ``__profile=html``, together with ``X-API-Key``. The request runs
+  normally, sampled every ``PROFILING_SAMPLE_INTERVAL`` seconds, and the
+  response is replaced by a flame graph (HTML) or a speedscope document.
+  The original status and duration come back in ``X-Profiled-Status`` and
+  ``X-Profiled-Duration-Ms``.
+* Continuous: with ``PROFILING_CONTINUOUS_INTERVAL`` > 0, samples are taken
+  at that low rate and aggregated per route, served by
+  ``GET /admin/profiling/hot-stacks``.
+
+Samples are attributed to a request on the event loop by finding the
+middleware frame on the stack, and in the threadpool by reading the request
+scope from the context anyio copies into the worker. That relies on anyio
+internals (the worker thread's ``run`` frame and its ``context`` local), so
+anyio is pinned to 4.x, tests/test_profiling.py fails if the hook moves, and
+setup logs a warning when it cannot be found. Time a request spends awaiting
+(I/O, or the loop running another request) is shown as ``(awaiting)``.
+"""
+
+import colorsys
+import html
+import json
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import zlib
+from contextvars import ContextVar
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.auth import require_api_key
+from app.core.config import settings
+from app.core.routing import route_label
+
+try:
+    from anyio._backends._asyncio import WorkerThread
+    _WORKER_RUN: Optional[CodeType] = WorkerThread.run.__code__
+except (ImportError, AttributeError):  # threadpool samples are then not attributed
+    _WORKER_RUN = None
+
+logger = logging.getLogger(__name__)
+
+OUTPUTS = ("html", "speedscope")
+AWAITING = "(awaiting)"
+THREADPOOL = "(threadpool)"
+TRUNCATED = "(other stacks)"
+
+# Frames root first; markers above are plain strings
+Stack = Tuple[Union[CodeType, str], ...]
+
+# Scope of the request being handled, copied by anyio into threadpool workers
+_request_scope: ContextVar[Optional[Scope]] = ContextVar("profiled_request_scope", default=None)
+
+
+_PATH_ROOTS = sorted(
+    {path for path in (sysconfig.get_paths()["purelib"], sysconfig.get_paths()["stdlib"], os.getcwd()) if path},
+    key=len,
+    reverse=True
+)
+
+
+def _short_path(filename: str) -> str:
+    for root in _PATH_ROOTS:
+        if filename.startswith(root + os.sep):
+            return filename[len(root) + 1:]
+    return filename
+
+
+def frame_label(frame: Union[CodeType, str]) -> str:
+    if isinstance(frame, str):
+        return frame
+    return f"{frame.co_qualname} ({_short_path(frame.co_filename)}:{frame.co_firstlineno})"
+
+
+class StackProfile:
+    """
+    Sampled stacks with the wall time (seconds) attributed to each
+    """
+
+    def __init__(self, max_stacks: int):
+        self.max_stacks = max_stacks
+        self.weights: Dict[Stack, float] = {}
+        self.samples = 0
+        self.total = 0.0
+
+    def add(self, stack: Stack, weight: float) -> None:
+        if stack not in self.weights and len(self.weights) >= self.max_stacks:
+            stack = (TRUNCATED,)
+        self.weights[stack] = self.weights.get(stack, 0.0) + weight
+        self.samples += 1
+        self.total += weight
+
+    def hot_stacks(self, limit: int) -> List[Dict[str, Any]]:
+        ranked = sorted(self.weights.items(), key=lambda entry: entry[1], reverse=True)[:limit]
+        return [
+            {
+                "frames": [frame_label(frame) for frame in stack],
+                "ms": round(weight * 1000, 2),
+                "share": round(weight / self.total, 4) if self.total else 0.0
+            }
+            for stack, weight in ranked
+        ]
+
+    def speedscope(self, name: str) -> bytes:
+        """
+        Document for https://www.speedscope.app (sampled profile, one entry per distinct stack)
+        """
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Union[CodeType, str], int] = {}
+        samples, weights = [], []
+        for stack, weight in self.weights.items():
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    if isinstance(frame, str):
+                        frames.append({"name": frame})
+                    else:
+                        frames.append({"name": frame.co_qualname, "file": frame.co_filename, "line": frame.co_firstlineno})
+                sample.append(index[frame])
+            samples.append(sample)
+            weights.append(round(weight * 1000, 3))
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": settings.PROJECT_NAME,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self.total * 1000, 3),
+                "samples": samples,
+                "weights": weights
+            }]
+        }).encode()
+
+    def html(self, title: str) -> bytes:
+        """
+        Self-contained flame graph (root on top); hover a frame for its time
+        """
+        root: Dict[str, Any] = {"label": "all", "value": 0.0, "children": {}}
+        for stack, weight in self.weights.items():
+            node = root
+            node["value"] += weight
+            for frame in stack:
+                node = node["children"].setdefault(frame, {"label": frame_label(frame), "value": 0.0, "children": {}})
+                node["value"] += weight
+
+        parts: List[str] = []
+        if root["value"]:
+            self._render(root, root["value"], root["value"] * 0.002, parts)
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>{html.escape(title)}</title><style>"
+            "body{font:12px sans-serif;margin:12px}"
+            ".n{box-sizing:border-box;display:inline-block;vertical-align:top}"
+            ".f{height:18px;line-height:18px;margin:0 1px 1px 0;padding:0 3px;white-space:nowrap;"
+            "overflow:hidden;text-overflow:ellipsis;border-radius:2px}"
+            ".c{display:flex}"
+            "</style></head><body>"
+            f"<h3>{html.escape(title)}</h3>"
+            f"<p>{self.samples} samples, {self.total * 1000:.1f} ms sampled</p>"
+            f"{''.join(parts)}</body></html>"
+        ).encode()
+
+    def _render(self, node: Dict[str, Any], parent_value: float, minimum: float, parts: List[str]) -> None:
+        hue = zlib.crc32(node["label"].encode()) % 60
+        red, green, blue = (int(channel * 255) for channel in colorsys.hls_to_rgb(hue / 360, 0.7, 0.8))
+        label = html.escape(node["label"])
+        parts.append(
+            f"<div class='n' style='width:{100 * node['value'] / parent_value:.3f}%'>"
+            f"<div class='f' style='background:rgb({red},{green},{blue})' "
+            f"title='{label} - {node['value'] * 1000:.1f} ms ({100 * node['value'] / self.total:.1f}%)'>{label}</div>"
+            "<div class='c'>"
+        )
+        children = sorted(node["children"].values(), key=lambda child: child["value"], reverse=True)
+        for child in children:
+            if child["value"] >= minimum:
+                self._render(child, node["value"], minimum, parts)
+        parts.append("</div></div>")
+
+
+class StackSampler:
+    """
+    Background thread handing every other thread's current frame to a callback
+    """
+
+    def __init__(self, interval: float, callback: Callable[[Dict[int, FrameType], float], None]):
+        self.interval = interval
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            frames.pop(me, None)
+            try:
+                self.callback(frames, now - last)
+            except Exception as exc:
+                logger.error(f"Profiler sample failed: {type(exc).__name__} - {exc}")
+            del frames
+            last = now
+
+
+def request_stack(leaf: FrameType, requests: Dict[FrameType, Scope]) -> Optional[Tuple[Scope, Stack]]:
+    """
+    Attribute one thread's stack to a request
+
+    Args:
+        leaf (FrameType): Innermost frame of the thread
+        requests (Dict[FrameType, Scope]): Middleware frames of tracked requests
+
+    Returns:
+        Optional[Tuple]: Request scope and the stack above its middleware frame
+        (or above the worker loop, prefixed with ``(threadpool)``); None when
+        the thread is not running request code
+    """
+    codes = []
+    frame = leaf
+    while frame is not None:
+        scope = requests.get(frame)
+        if scope is not None:
+            return scope, tuple(reversed(codes))
+        if frame.f_code is _WORKER_RUN:
+            context = frame.f_locals.get("context")
+            scope = context.get(_request_scope) if context is not None else None
+            if scope is None or not codes:
+                return None
+            return scope, (THREADPOOL,) + tuple(reversed(codes))
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    return None
+
+
+class Profiler:
+    """
+    Continuous per-route sampling plus one-off request profiles
+    """
+
+    def __init__(self, sample_interval: float, continuous_interval: float, max_stacks: int):
+        self.sample_interval = sample_interval
+        self.continuous_interval = continuous_interval
+        self.max_stacks = max_stacks
+        self.requests: Dict[FrameType, Scope] = {}
+        self.routes: Dict[str, StackProfile] = {}
+        self.lock = threading.Lock()
+        self._sampler = StackSampler(continuous_interval, self._record) if continuous_interval > 0 else None
+
+    @property
+    def continuous(self) -> bool:
+        return self._sampler is not None
+
+    def start(self) -> None:
+        if self._sampler is not None:
+            self._sampler.start()
+            logger.info(f"Continuous profiling started - one sample every {self.continuous_interval}s")
+
+    def stop(self) -> None:
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.routes = {}
+
+    def _record(self, frames: Dict[int, FrameType], weight: float) -> None:
+        with self.lock:
+            for leaf in frames.values():
+                found = request_stack(leaf, self.requests)
+                if found is None:
+                    continue
+                scope, stack = found
+                label = route_label(scope)
+                profile = self.routes.get(label)
+                if profile is None:
+                    profile = self.routes[label] = StackProfile(self.max_stacks)
+                profile.add(stack, weight)
+
+    async def track(self, app: ASGIApp, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Run a request with its frame and scope registered for attribution
+        """
+        frame = sys._getframe()
+        token = _request_scope.set(scope)
+        self.requests[frame] = scope
+        try:
+            await app(scope, receive, send)
+        finally:
+            del self.requests[frame]
+            _request_scope.reset(token)
+
+    async def profile(self, app: ASGIApp, scope: Scope, receive: Receive) -> Tuple[StackProfile, int, float]:
+        """
+        Run one request under a high-rate sampler, discarding its response
+
+        Returns:
+            Tuple: profile, original status code and duration in seconds
+        """
+        profile = StackProfile(self.max_stacks)
+        frame = sys._getframe()
+        tracked = {frame: scope}
+        status_code = 500
+        done = False
+
+        def sample(frames: Dict[int, FrameType], weight: float) -> None:
+            if done:
+                return
+            hit = False
+            for leaf in frames.values():
+                found = request_stack(leaf, tracked)
+                if found is not None and found[0] is scope:
+                    profile.add(found[1], weight)
+                    hit = True
+            if not hit:
+                profile.add((AWAITING,), weight)
+
+        async def capture(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        token = _request_scope.set(scope)
+        sampler = StackSampler(self.sample_interval, sample)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await app(scope, receive, capture)
+        finally:
+            done = True
+            sampler.stop()
+            _request_scope.reset(token)
+        return profile, status_code, time.perf_counter() - started
+
+
+profiler = Profiler(
+    sample_interval=settings.PROFILING_SAMPLE_INTERVAL,
+    continuous_interval=settings.PROFILING_CONTINUOUS_INTERVAL if settings.PROFILING_ENABLED else 0,
+    max_stacks=settings.PROFILING_MAX_STACKS
+)
+
+
+def requested_output(scope: Scope) -> Optional[str]:
+    """
+    Output format asked for by ``X-Profile`` or ``?__profile=``, if any
+    """
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.decode("latin-1").strip().lower() or "html"
+    query_string = scope.get("query_string", b"")
+    if b"__profile" in query_string:
+        values = parse_qs(query_string.decode("latin-1"), keep_blank_values=True).get("__profile")
+        if values is not None:
+            return values[0].strip().lower() or "html"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware answering profiled requests with their flame graph and
+    registering every other request for continuous sampling
+    """
+
+    def __init__(self, app: ASGIApp, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        output = requested_output(scope)
+        if output is not None:
+            await self._profile(scope, receive, send, output)
+        elif self.profiler.continuous:
+            await self.profiler.track(self.app, scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, output: str) -> None:
+        try:
+            require_api_key(Headers(scope=scope).get("x-api-key"))
+            if output not in OUTPUTS:
+                raise HTTPException(status_code=400, detail=f"Unknown profile output {output!r}; use one of {list(OUTPUTS)}")
+        except HTTPException as exc:
+            await JSONResponse({"detail": exc.detail}, status_code=exc.status_code)(scope, receive, send)
+            return
+
+        profile, status_code, elapsed = await self.profiler.profile(self.app, scope, receive)
+        title = f"{scope['method']} {scope['path']} - {elapsed * 1000:.1f} ms"
+        logger.info(f"Profiled {title} ({profile.samples} samples)")
+        headers = {"X-Profiled-Status": str(status_code), "X-Profiled-Duration-Ms": f"{elapsed * 1000:.1f}"}
+
+        if output == "speedscope":
+            headers["Content-Disposition"] = 'attachment; filename="profile.speedscope.json"'
+            response = Response(profile.speedscope(title), media_type="application/json", headers=headers)
+        else:
+            response = Response(profile.html(title), media_type="text/html", headers=headers)
+        await response(scope, receive, send)
+
+
+def setup_profiling(app: FastAPI) -> None:
+    """
+    Setup the sampling profiler middleware for the FastAPI application
+
+    Args:
+        app (FastAPI): FastAPI application instance
+    """
+
+    if not settings.PROFILING_ENABLED:
+        return
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    if _WORKER_RUN is None:
+        logger.warning(
+            "Profiling: anyio worker thread hook not found (anyio upgraded?); "
+            "threadpool samples will not be attributed to requests"
+        )
+
+    logger.info(
+        f"Profiling enabled - per-request interval: {settings.PROFILING_SAMPLE_INTERVAL}s, "
+        f"continuous: {'every ' + str(profiler.continuous_interval) + 's' if profiler.continuous else 'off'}"
+    )
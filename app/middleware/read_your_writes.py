@@ -0,0 +1,68 @@
+"""
+Read-your-writes client identification for Kaivora API
+
+Reads of a client that wrote within ``READ_YOUR_WRITES_WINDOW`` stay on the
+primary (see ``app.db.session``), so the client needs a key of its own. The
+client address will not do: behind a load balancer every client shares the
+balancer's address, and one write would pin everyone to the primary. A
+request without a bearer token or the ``READ_YOUR_WRITES_COOKIE`` cookie
+that writes gets a random id, set as that cookie on the response. Clients
+that keep cookies (or send a token) then read their own writes; anonymous
+clients that drop cookies simply read from the replicas.
+"""
+
+import logging
+import secrets
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.db.session import CLIENT_KEY_SCOPE, SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware issuing a client id cookie on writes from unidentified clients
+    """
+
+    def __init__(self, app: ASGIApp, cookie_name: str):
+        self.app = app
+        self.cookie_name = cookie_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if "authorization" in headers or self.cookie_name in cookie_parser(headers.get("cookie", "")):
+            await self.app(scope, receive, send)
+            return
+
+        key = secrets.token_urlsafe(16)
+        scope[CLIENT_KEY_SCOPE] = key
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"]).append(
+                    "Set-Cookie", f"{self.cookie_name}={key}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def setup_read_your_writes(app: FastAPI) -> None:
+    """
+    Setup read-your-writes client identification for the FastAPI application
+
+    Args:
+        app (FastAPI): FastAPI application instance
+    """
+
+    app.add_middleware(ReadYourWritesMiddleware, cookie_name=settings.READ_YOUR_WRITES_COOKIE)
+    logger.info(f"Read-your-writes clients identified by the {settings.READ_YOUR_WRITES_COOKIE!r} cookie")
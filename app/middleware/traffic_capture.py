@@ -0,0 +1,259 @@
+"""
+Sampled traffic capture for Kaivora API
+
+With ``TRAFFIC_CAPTURE_ENABLED``, a ``TRAFFIC_CAPTURE_SAMPLE_RATE`` fraction
+of HTTP requests is written as one compact JSON line each: start time,
+method, path, route template, query, body, status, response size and
+duration. ``scripts/replay_traffic.py`` re-drives a capture against a local
+instance.
+
+Bodies are recorded by shape only: the structure and value types of a JSON
+body, the field names of a form, the size of anything else. Replays fill in
+placeholder values of the same types. ``TRAFFIC_CAPTURE_BODY_VALUES`` opts
+in to recording JSON and form values too, for replays that need the real
+payloads; even then nothing that authenticates a caller is kept: headers
+are not recorded, and password, token and key fields in JSON, form and
+query data are masked. Lines are written by a background thread; the file
+rotates at ``TRAFFIC_CAPTURE_MAX_BYTES`` and rotated files are gzipped.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import shutil
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.routing import route_label
+
+logger = logging.getLogger(__name__)
+
+MASK = "***"
+SENSITIVE_FIELDS = frozenset({
+    "password", "new_password", "old_password", "token", "access_token", "refresh_token",
+    "api_key", "apikey", "secret", "client_secret", "__profile"
+})
+EXCLUDED_PREFIXES = ("/admin/",)
+
+
+def redact(value: Any) -> Any:
+    """
+    Copy of a decoded JSON/form value with sensitive fields masked
+    """
+    if isinstance(value, dict):
+        return {
+            key: MASK if key.lower() in SENSITIVE_FIELDS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _redact_pairs(pairs: List[tuple]) -> List[tuple]:
+    return [(key, MASK if key.lower() in SENSITIVE_FIELDS else value) for key, value in pairs]
+
+
+def json_types(value: Any) -> Any:
+    """
+    Structure of a decoded JSON value with every leaf replaced by its type name
+    """
+    if isinstance(value, dict):
+        return {key: json_types(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [json_types(item) for item in value]
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    return type(value).__name__  # str, int or float
+
+
+def body_shape(content_type: str, body: bytes, max_body: int, values: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Replayable form of a request body, holding no user data unless ``values``
+
+    Returns:
+        Optional[dict]: ``{"json_types": ...}``, ``{"form_keys": [...]}`` or,
+        with ``values``, redacted ``{"json": ...}`` / ``{"form": [...]}``;
+        ``{"size": n, "type": ...}`` for anything else; None without a body
+    """
+    if not body:
+        return None
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if len(body) <= max_body:
+        if media_type == "application/json":
+            try:
+                decoded = json.loads(body)
+            except ValueError:
+                pass
+            else:
+                return {"json": redact(decoded)} if values else {"json_types": json_types(decoded)}
+        elif media_type == "application/x-www-form-urlencoded":
+            pairs = parse_qsl(body.decode("latin-1"), keep_blank_values=True)
+            return {"form": _redact_pairs(pairs)} if values else {"form_keys": [key for key, _ in pairs]}
+    return {"size": len(body), "type": media_type}
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class TrafficRecorder:
+    """
+    Appends capture lines to a size-rotated file from a background thread
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        handler.namer = lambda name: name + ".gz"
+        handler.rotator = _gzip_rotator
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.path = path
+        self.recorded = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, handler)
+        self._running = False
+
+    def start(self) -> None:
+        if not self._running:
+            self._listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        if self._running:
+            self._listener.stop()
+            self._running = False
+            for handler in self._listener.handlers:
+                handler.close()
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        if not self._running:
+            return
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        self._queue.put_nowait(logging.makeLogRecord({"msg": line, "args": None}))
+        self.recorded += 1
+
+
+class TrafficCaptureMiddleware:
+    """
+    ASGI middleware recording a random sample of HTTP requests
+    """
+
+    def __init__(self, app: ASGIApp, recorder: TrafficRecorder, sample_rate: float, max_body: int,
+                 body_values: bool = False):
+        self.app = app
+        self.recorder = recorder
+        self.sample_rate = sample_rate
+        self.max_body = max_body
+        self.body_values = body_values
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or random.random() >= self.sample_rate
+            or scope["path"].startswith(EXCLUDED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        chunks: List[bytes] = []
+        body_size = 0
+        status_code = 500
+        response_size = 0
+
+        # Tee the body as the app reads it; a body the app never reads does not affect a replay
+        async def receive_wrapper() -> Message:
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                if body_size <= self.max_body:
+                    chunks.append(chunk)
+                body_size += len(chunk)
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            content_type = Headers(scope=scope).get("content-type", "")
+            if body_size <= self.max_body:
+                shape = body_shape(content_type, b"".join(chunks), self.max_body, self.body_values)
+            else:
+                shape = {"size": body_size, "type": content_type.split(";", 1)[0].strip().lower()}
+            query = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+            entry = {
+                "t": round(started_at, 4),
+                "m": scope["method"],
+                "p": scope["path"],
+                "r": route_label(scope).partition(" ")[2],
+                "q": urlencode(_redact_pairs(query)),
+                "b": shape,
+                "s": status_code,
+                "n": response_size,
+                "d": round((time.perf_counter() - started) * 1000, 2)
+            }
+            self.recorder.record(entry)
+
+
+def _build_recorder() -> Optional[TrafficRecorder]:
+    if not settings.TRAFFIC_CAPTURE_ENABLED:
+        return None
+    return TrafficRecorder(
+        settings.TRAFFIC_CAPTURE_PATH,
+        max_bytes=settings.TRAFFIC_CAPTURE_MAX_BYTES,
+        backups=settings.TRAFFIC_CAPTURE_BACKUPS
+    )
+
+
+traffic_recorder = _build_recorder()
+
+
+def setup_traffic_capture(app: FastAPI) -> None:
+    """
+    Setup sampled traffic capture for the FastAPI application
+
+    Args:
+        app (FastAPI): FastAPI application instance
+    """
+
+    if traffic_recorder is None:
+        return
+
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        recorder=traffic_recorder,
+        sample_rate=settings.TRAFFIC_CAPTURE_SAMPLE_RATE,
+        max_body=settings.TRAFFIC_CAPTURE_MAX_BODY,
+        body_values=settings.TRAFFIC_CAPTURE_BODY_VALUES
+    )
+
+    logger.info(
+        f"Traffic capture enabled - sampling {settings.TRAFFIC_CAPTURE_SAMPLE_RATE:.1%} of requests "
+        f"into {settings.TRAFFIC_CAPTURE_PATH}"
+        + (" (with body values)" if settings.TRAFFIC_CAPTURE_BODY_VALUES else "")
+    )
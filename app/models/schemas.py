@@ -2,9 +2,10 @@
 Pydantic models for request/response validation
 """
 
-from pydantic import BaseModel, Field, validator, EmailStr
-from typing import Optional, Any
+from pydantic import AfterValidator, BaseModel, EmailStr, Field, StringConstraints, field_validator
+from typing import Annotated, Dict, List, Optional, Any
 from datetime import datetime
+from functools import partial
 
 # 🌟 MODELOS GERAIS
 
@@ -31,43 +32,33 @@ class ErrorResponse(BaseModel):
 
 # 🌟 MODELOS DE ITEM
 
+# Constraints are declared as annotated types so pydantic-core applies them
+# without calling back into Python (price rounding is the one builtin call)
+ItemName = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=100)]
+ItemDescription = Annotated[str, StringConstraints(max_length=500)]
+ItemPrice = Annotated[float, Field(ge=0), AfterValidator(partial(round, ndigits=2))]
+
 class ItemBase(BaseModel):
-    name: str = Field(..., min_length=1, max_length=100, description="Item name")
-    description: Optional[str] = Field(None, max_length=500, description="Item description")
-    price: float = Field(..., ge=0, description="Item price (must be >= 0)")
-
-    @validator('name')
-    def name_must_not_be_empty(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Name cannot be empty')
-        return v.strip()
-
-    @validator('price')
-    def price_must_be_positive(cls, v):
-        if v < 0:
-            raise ValueError('Price must be greater than or equal to 0')
-        return round(v, 2)
+    name: ItemName = Field(..., description="Item name (surrounding whitespace is stripped)")
+    description: Optional[ItemDescription] = Field(None, description="Item description")
+    price: ItemPrice = Field(..., description="Item price (must be >= 0, rounded to 2 decimals)")
 
 class ItemCreate(ItemBase):
     pass
 
 class ItemUpdate(BaseModel):
-    name: Optional[str] = Field(None, min_length=1, max_length=100)
-    description: Optional[str] = Field(None, max_length=500)
-    price: Optional[float] = Field(None, ge=0)
-    is_active: Optional[bool] = Field(None)
-
-    @validator('name')
-    def name_must_not_be_empty(cls, v):
-        if v is not None and (not v.strip()):
-            raise ValueError('Name cannot be empty')
-        return v.strip() if v else v
-
-    @validator('price')
-    def price_must_be_positive(cls, v):
-        if v is not None and v < 0:
-            raise ValueError('Price must be >= 0')
-        return round(v, 2) if v is not None else v
+    name: Optional[ItemName] = None
+    description: Optional[ItemDescription] = None
+    price: Optional[ItemPrice] = None
+    is_active: Optional[bool] = None
+
+    # Omitted means "unchanged"; an explicit null would hit a NOT NULL column
+    @field_validator("name", "price", "is_active")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but cannot be null")
+        return value
 
 class ItemResponse(ItemBase):
     id: int
@@ -80,6 +71,35 @@ class ItemResponse(ItemBase):
             datetime: lambda v: v.isoformat()
         }
 
+class ItemChanges(BaseModel):
+    items: List[ItemResponse] = Field(..., description="Items created or updated since the watermark")
+    deleted: List[int] = Field(..., description="IDs of items deleted since the watermark")
+    archived: List[int] = Field([], description="IDs of items moved to the archive since the watermark (still readable by ID)")
+    watermark: Optional[str] = Field(None, description="Pass as `since` on the next call")
+    has_more: bool = Field(..., description="More changes are pending; call again right away")
+
+class ItemBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, description="Item IDs to fetch, in the order wanted")
+
+class ItemBatchResponse(BaseModel):
+    items: List[ItemResponse] = Field(..., description="Found items, in request order")
+    missing: List[int] = Field(..., description="Requested IDs that do not exist")
+
+class PriceBucket(BaseModel):
+    min: Optional[float] = Field(None, description="Inclusive lower bound (None = unbounded)")
+    max: Optional[float] = Field(None, description="Exclusive upper bound (None = unbounded)")
+    count: int
+
+class ItemStatsResponse(BaseModel):
+    total_count: int
+    active_count: int
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    price_avg: Optional[float] = None
+    price_histogram: List[PriceBucket]
+    created_per_day: Dict[str, int] = Field(..., description="Items created per day (YYYY-MM-DD)")
+    reconciled_at: Optional[datetime] = Field(None, description="Last full reconcile against the database")
+
 # 🌟 MODELO DE SAÚDE
 
 class HealthResponse(BaseModel):
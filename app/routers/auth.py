@@ -1,14 +1,20 @@
 # app/routers/auth.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
 
 from app.core import auth
-from app.db.base import get_db
-from app.db.crud_users import get_user_by_username, get_user_by_email, create_user
-from app.models.user import UserCreate, Token
+from app.core.config import settings
+from app.db.session import SessionLocal, get_db
+from app.db.crud_users import get_user_by_username, get_user_by_email, create_user, bulk_create_users
+from app.db.crud_tokens import issue_refresh_token, rotate_refresh_token
+from app.models.user import UserCreate, Token, RefreshRequest
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -16,13 +22,11 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
 
 # Login endpoint with database verification
 @router.post("/login", response_model=TokenResponse, summary="Login Authentication")
-def login(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
-):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = get_user_by_username(db, form_data.username)
     if not user or not auth.verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -32,7 +36,24 @@ def login(
         )
 
     token = auth.create_access_token(data={"sub": user.username})
-    return {"access_token": token, "token_type": "bearer"}
+    # The user lookup and the token insert share one primary session (login writes anyway)
+    refresh_token = issue_refresh_token(db, user.id, user.username)
+    return {"access_token": token, "token_type": "bearer", "refresh_token": refresh_token}
+
+# Renew an access token without a password: one indexed lookup instead of bcrypt
+@router.post("/refresh", response_model=TokenResponse, summary="Refresh access token")
+def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
+    rotated = rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    refresh_token, subject = rotated
+    token = auth.create_access_token(data={"sub": subject})
+    return {"access_token": token, "token_type": "bearer", "refresh_token": refresh_token}
 
 # Register new user endpoint
 @router.post("/register", response_model=Token, summary="Register new user")
@@ -51,4 +72,24 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 
     user_created = create_user(db, user)
     token = auth.create_access_token({"sub": user_created.username})
-    return Token(access_token=token)
\ No newline at end of file
+    refresh_token = issue_refresh_token(db, user_created.id, user_created.username)
+    return Token(access_token=token, refresh_token=refresh_token)
+
+# Bulk import (admin): streams one NDJSON result line per input row
+@router.post(
+    "/register/bulk",
+    summary="Bulk register users",
+    dependencies=[Depends(auth.require_api_key)],
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+def register_bulk(users: List[Dict[str, Any]] = Body(..., description="Objects with username, email and password")):
+    def report():
+        db = SessionLocal()
+        try:
+            for result in bulk_create_users(db, users, settings.USER_IMPORT_CHUNK_SIZE):
+                yield json.dumps(result) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(report(), media_type="application/x-ndjson")
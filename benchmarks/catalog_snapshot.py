@@ -0,0 +1,126 @@
+"""
+Columnar catalog snapshot vs ORM objects
+
+Seeds N items, then compares the memory held by the catalog as ORM objects
+(``db.query(Item).all()``) with the columnar snapshot, and the latency of a
+typical filtered listing (active items in a price range, sorted by price,
+first 100) answered by SQL and by the snapshot.
+
+Usage:
+    python -m benchmarks.catalog_snapshot [--items 200000] [--queries 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = tempfile.mkdtemp(prefix="kaivora-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from app.db.catalog_snapshot import CatalogReadModel
+from app.db.crud_items import query_items
+from app.db.init_db import init_database
+from app.db.models import Item, utcnow
+from app.db.session import SessionLocal
+
+QUERY = {"min_price": 100.0, "max_price": 400.0, "is_active": True, "order_by": "price"}
+
+
+def seed(count: int) -> None:
+    init_database()
+    random.seed(42)
+    db = SessionLocal()
+    try:
+        for start in range(0, count, 50000):
+            now = utcnow()
+            db.execute(insert(Item), [
+                {
+                    "name": f"Item {i}",
+                    "description": f"Description of item {i}" if i % 2 else None,
+                    "price": round(random.uniform(1, 1000), 2),
+                    "is_active": i % 5 != 0,
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for i in range(start, min(start + 50000, count))
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def orm_footprint() -> int:
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        items = db.query(Item).all()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del items
+        return current
+    finally:
+        db.close()
+
+
+def sql_query() -> list:
+    db = SessionLocal()
+    try:
+        return query_items(db, 0, 100, **QUERY)
+    finally:
+        db.close()
+
+
+def timed(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(label: str, samples: list) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"  {label}  p50 {statistics.median(samples):8.2f} ms  p95 {p95:8.2f} ms")
+
+
+def main(count: int, queries: int) -> None:
+    print(f"Seeding {count} items...")
+    seed(count)
+
+    # Seeding has committed: no need to hold recent changes back
+    read_model = CatalogReadModel(SessionLocal, max_staleness=3600, feed_lag=0)
+    started = time.perf_counter()
+    asyncio.run(read_model.refresh())
+    snapshot = read_model.snapshot
+    print(f"Snapshot built in {time.perf_counter() - started:.2f} s")
+
+    print("\nMemory")
+    print(f"  ORM objects  {orm_footprint() / 2 ** 20:8.1f} MiB")
+    print(f"  snapshot     {snapshot.nbytes() / 2 ** 20:8.1f} MiB")
+
+    expected = [item.id for item in sql_query()]
+    assert [row["id"] for row in snapshot.query(0, 100, **QUERY)] == expected
+
+    print(f"\nActive items priced {QUERY['min_price']:.0f}-{QUERY['max_price']:.0f}, by price, first 100")
+    report("SQL     ", timed(sql_query, queries))
+    report("snapshot", timed(lambda: snapshot.query(0, 100, **QUERY), queries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    main(args.items, args.queries)
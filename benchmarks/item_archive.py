@@ -0,0 +1,161 @@
+"""
+Hot/cold item tiering benchmark
+
+Seeds N items (by default 10M, 80% of them inactive and untouched for a
+month), times the listing queries of an active catalog before and after the
+archival job moves the inactive rows to items_archive, and reports the
+archival throughput and the size of each table with its indexes.
+
+Usage:
+    python -m benchmarks.item_archive [--items 10000000] [--inactive 0.8] [--batch-size 10000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+BENCH_DIR = tempfile.mkdtemp(prefix="kaivora-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.exc import OperationalError
+
+from app.db.init_db import init_database
+from app.db.item_archive import archive_items
+from app.db.models import ArchivedItem, Item, utcnow
+from app.db.session import SessionLocal, engine
+
+
+def seed(count: int, inactive: float) -> None:
+    init_database()
+    random.seed(42)
+    now = utcnow()
+    stale = now - timedelta(days=30)
+    db = SessionLocal()
+    try:
+        for start in range(0, count, 100000):
+            rows = []
+            for i in range(start, min(start + 100000, count)):
+                is_active = random.random() >= inactive
+                rows.append({
+                    "name": f"Item {i}",
+                    "price": round(random.uniform(1, 1000), 2),
+                    "is_active": is_active,
+                    "created_at": stale,
+                    "updated_at": now if is_active else stale
+                })
+            db.execute(insert(Item), rows)
+            db.commit()
+            print(f"\r  seeded {min(start + 100000, count):,}", end="", flush=True)
+        print()
+    finally:
+        db.close()
+
+
+def listing_queries(hot_id: int, cold_id: int):
+    def active_by_price(db):
+        return db.query(Item).filter(Item.is_active.is_(True)).order_by(Item.price, Item.id).limit(100).all()
+
+    def active_deep_page(db):
+        return db.query(Item).filter(Item.is_active.is_(True)).order_by(Item.id).offset(10000).limit(100).all()
+
+    def count_active(db):
+        return db.query(func.count(Item.id)).filter(Item.is_active.is_(True)).scalar()
+
+    def get_hot(db):
+        return db.get(Item, hot_id) or db.get(ArchivedItem, hot_id)
+
+    def get_cold(db):
+        return db.get(Item, cold_id) or db.get(ArchivedItem, cold_id)
+
+    return [
+        ("active, by price, top 100", active_by_price),
+        ("active, by id, offset 10000", active_deep_page),
+        ("count active", count_active),
+        ("get_item (active item)", get_hot),
+        ("get_item (inactive item)", get_cold)
+    ]
+
+
+def measure(queries, repeat: int) -> dict:
+    results = {}
+    for label, query in queries:
+        samples = []
+        for _ in range(repeat):
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                query(db)
+                samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+        results[label] = statistics.median(samples)
+    return results
+
+
+def table_sizes() -> dict:
+    """Bytes per table including its indexes (SQLite dbstat), empty when unavailable"""
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT COALESCE(m.tbl_name, s.name), SUM(s.pgsize) FROM dbstat s "
+                "LEFT JOIN sqlite_master m ON m.name = s.name GROUP BY 1"
+            )).all()
+    except OperationalError:
+        return {}
+    return {name: size for name, size in rows if name in (Item.__tablename__, ArchivedItem.__tablename__)}
+
+
+def main(count: int, inactive: float, batch_size: int, repeat: int) -> None:
+    print(f"Seeding {count:,} items ({inactive:.0%} inactive)...")
+    seed(count, inactive)
+
+    db = SessionLocal()
+    try:
+        hot_id = db.query(Item.id).filter(Item.is_active.is_(True)).order_by(Item.id.desc()).limit(1).scalar()
+        cold_id = db.query(Item.id).filter(Item.is_active.is_(False)).order_by(Item.id.desc()).limit(1).scalar()
+    finally:
+        db.close()
+    queries = listing_queries(hot_id, cold_id)
+
+    before_sizes = table_sizes()
+    before = measure(queries, repeat)
+
+    started = time.perf_counter()
+    archived = asyncio.run(archive_items(SessionLocal, batch_size, pause=0))
+    elapsed = time.perf_counter() - started
+    print(f"Archived {archived:,} items in {elapsed:.1f} s ({archived / elapsed:,.0f} rows/s, batches of {batch_size})")
+    if engine.dialect.name == "sqlite":
+        # Give the pages freed by the move back, so sizes compare fairly
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+
+    after_sizes = table_sizes()
+    after = measure(queries, repeat)
+
+    print(f"\n{'query (median ms)':<32} {'single table':>13} {'hot/cold':>10}")
+    for label, _ in queries:
+        print(f"  {label:<30} {before[label]:13.2f} {after[label]:10.2f}")
+
+    if before_sizes:
+        print("\nTable + index size (MiB)")
+        for name in (Item.__tablename__, ArchivedItem.__tablename__):
+            print(f"  {name:<30} {before_sizes.get(name, 0) / 2 ** 20:13.1f} {after_sizes.get(name, 0) / 2 ** 20:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10000000)
+    parser.add_argument("--inactive", type=float, default=0.8, help="Share of inactive items")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.items, args.inactive, args.batch_size, args.repeat)
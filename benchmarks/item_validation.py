@@ -0,0 +1,105 @@
+"""
+Item payload validation benchmark
+
+Validates N item payloads with the previous schema (v1-style @validator
+methods on plain Field constraints) and with the annotated-type schema in
+app.models.schemas, and reports rows validated per second for one model
+per row and for a whole JSON array through a TypeAdapter.
+
+Usage:
+    python -m benchmarks.item_validation [--rows 100000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import warnings
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.models.schemas import ItemCreate
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from pydantic import validator
+
+    class LegacyItemCreate(BaseModel):
+        """ItemCreate as it was before the move to annotated constraints"""
+
+        name: str = Field(..., min_length=1, max_length=100)
+        description: Optional[str] = Field(None, max_length=500)
+        price: float = Field(..., ge=0)
+
+        @validator('name')
+        def name_must_not_be_empty(cls, v):
+            if not v or not v.strip():
+                raise ValueError('Name cannot be empty')
+            return v.strip()
+
+        @validator('price')
+        def price_must_be_positive(cls, v):
+            if v < 0:
+                raise ValueError('Price must be greater than or equal to 0')
+            return round(v, 2)
+
+
+def payloads(count: int) -> List[dict]:
+    random.seed(42)
+    return [
+        {
+            "name": f" Item {i} ",
+            "description": f"Description of item {i}" if i % 2 else None,
+            "price": random.uniform(1, 1000)
+        }
+        for i in range(count)
+    ]
+
+
+def rows_per_second(run, rows: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return rows / statistics.median(samples)
+
+
+def main(rows: int, repeat: int) -> None:
+    data = payloads(rows)
+    body = json.dumps(data).encode()
+    print(f"Validating {rows:,} item payloads ({len(body) / 2 ** 20:.1f} MiB as JSON), median of {repeat} runs\n")
+
+    def per_row(model):
+        return lambda: [model.model_validate(row) for row in data]
+
+    def adapter_python(model):
+        adapter = TypeAdapter(List[model])
+        return lambda: adapter.validate_python(data)
+
+    def adapter_json(model):
+        adapter = TypeAdapter(List[model])
+        return lambda: adapter.validate_json(body)
+
+    print(f"{'rows/s':<40} {'@validator':>12} {'annotated':>12} {'speedup':>8}")
+    for label, make_run in (
+        ("model_validate per row", per_row),
+        ("TypeAdapter(list).validate_python", adapter_python),
+        ("TypeAdapter(list).validate_json", adapter_json)
+    ):
+        before, after = (rows_per_second(make_run(model), rows, repeat) for model in (LegacyItemCreate, ItemCreate))
+        print(f"  {label:<38} {before:12,.0f} {after:12,.0f} {after / before:7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,85 @@
+"""
+Thundering-herd benchmark for item reads
+
+Fires N concurrent GET /api/v1/items/{id} (and identical list_items pages)
+at the app in-process and counts the SELECTs that reach the database, with
+single-flight coalescing off and on.
+
+Usage:
+    python -m benchmarks.thundering_herd [--clients 500] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = tempfile.mkdtemp(prefix="kaivora-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import event
+
+from app import create_app
+from app.core.config import settings
+from app.db.init_db import init_database
+from app.db.models import Item
+from app.db.session import SessionLocal, engine
+
+
+def seed() -> int:
+    init_database()
+    db = SessionLocal()
+    try:
+        item = Item(name="Hot item", description="Pushed to every phone", price=9.99, is_active=True)
+        db.add(item)
+        db.add_all(Item(name=f"Item {i}", price=float(i), is_active=True) for i in range(200))
+        db.commit()
+        return item.id
+    finally:
+        db.close()
+
+
+async def herd(client: httpx.AsyncClient, url: str, clients: int, rounds: int):
+    statements = 0
+
+    def count(*_args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    try:
+        for _ in range(rounds):
+            responses = await asyncio.gather(*(client.get(url) for _ in range(clients)))
+            assert all(r.status_code == 200 for r in responses)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    elapsed = time.perf_counter() - started
+    return statements, clients * rounds / elapsed
+
+
+async def main(clients: int, rounds: int) -> None:
+    item_id = seed()
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for url in (f"/api/v1/items/{item_id}", "/api/v1/items?skip=0&limit=100"):
+            print(f"\n{url} - {clients} concurrent clients x {rounds} rounds")
+            for enabled in (False, True):
+                settings.SINGLE_FLIGHT_ENABLED = enabled
+                statements, rps = await herd(client, url, clients, rounds)
+                label = "single-flight" if enabled else "baseline     "
+                print(f"  {label}  {statements:6d} SELECTs  {rps:9.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.rounds))
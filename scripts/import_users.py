@@ -0,0 +1,55 @@
+# scripts/import_users.py
+"""
+Bulk user import from the command line
+
+Reads users (username, email, password) from a CSV file with a header row,
+a JSON array or NDJSON, and prints one JSON result line per row.
+
+    python scripts/import_users.py users.csv > report.ndjson
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.crud_users import bulk_create_users
+from app.db.session import SessionLocal
+
+
+def read_rows(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(f)
+        elif path.endswith(".json"):
+            yield from json.load(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import users")
+    parser.add_argument("path", help="CSV (with header), JSON array or NDJSON file")
+    parser.add_argument("--chunk-size", type=int, default=settings.USER_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    totals = Counter()
+    db = SessionLocal()
+    try:
+        for result in bulk_create_users(db, read_rows(args.path), args.chunk_size):
+            totals[result["status"]] += 1
+            print(json.dumps(result))
+    finally:
+        db.close()
+    print(f"✅ {dict(totals)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
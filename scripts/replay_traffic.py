@@ -0,0 +1,173 @@
+# scripts/replay_traffic.py
+"""
+Replay captured traffic against a running instance
+
+Reads a capture written with TRAFFIC_CAPTURE_ENABLED (the live file plus
+its rotated .gz files), re-sends every request keeping the original gaps
+between them divided by --speed, and prints latency percentiles per route
+next to the latency seen when the traffic was captured.
+
+    python scripts/replay_traffic.py captures/traffic.jsonl --base-url http://localhost:8000 --speed 4
+
+Captures hold no credentials: pass them with --header (e.g. an API key or a
+bearer token). Masked body fields are sent as "***". Bodies captured by
+shape only are sent with placeholder values of the recorded types.
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import math
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+import httpx
+
+
+def capture_files(path: str) -> List[str]:
+    rotated = sorted(glob.glob(f"{glob.escape(path)}.*.gz"), key=lambda name: int(name.rsplit(".", 2)[1]), reverse=True)
+    return rotated + ([path] if glob.glob(glob.escape(path)) else [])
+
+
+def read_capture(path: str) -> List[Dict[str, Any]]:
+    entries = []
+    for name in capture_files(path):
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(name, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+PLACEHOLDERS = {"str": "replay", "int": 1, "float": 1.0, "bool": True, "null": None}
+
+
+def placeholder(shape: Any) -> Any:
+    """
+    JSON value with the structure of a captured ``json_types`` shape
+    """
+    if isinstance(shape, dict):
+        return {key: placeholder(item) for key, item in shape.items()}
+    if isinstance(shape, list):
+        return [placeholder(item) for item in shape]
+    return PLACEHOLDERS.get(shape)
+
+
+def request_args(entry: Dict[str, Any]) -> Dict[str, Any]:
+    url = entry["p"] + (f"?{entry['q']}" if entry.get("q") else "")
+    args: Dict[str, Any] = {"method": entry["m"], "url": url}
+    body = entry.get("b")
+    if body is None:
+        return args
+    if "json" in body:
+        args["json"] = body["json"]
+    elif "json_types" in body:
+        args["json"] = placeholder(body["json_types"])
+    elif "form" in body:
+        args["data"] = dict(body["form"])
+    elif "form_keys" in body:
+        args["data"] = {key: PLACEHOLDERS["str"] for key in body["form_keys"]}
+    else:
+        # Only the size was captured: send filler of the same size
+        args["content"] = b" " * body["size"]
+        if body.get("type"):
+            args["headers"] = {"Content-Type": body["type"]}
+    return args
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+
+
+async def replay(entries: List[Dict[str, Any]], base_url: str, speed: float, concurrency: int,
+                 headers: Dict[str, str], timeout: float):
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    captured: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def send(client: httpx.AsyncClient, entry: Dict[str, Any]) -> None:
+        route = f"{entry['m']} {entry.get('r') or entry['p']}"
+        captured[route].append(entry["d"])
+        try:
+            started = time.perf_counter()
+            response = await client.request(**request_args(entry))
+            latencies[route].append((time.perf_counter() - started) * 1000)
+            statuses[route][response.status_code] += 1
+        except httpx.HTTPError as exc:
+            statuses[route][type(exc).__name__] += 1
+        finally:
+            limit.release()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout, limits=limits) as client:
+        tasks = []
+        first = entries[0]["t"] if entries else 0.0
+        started = time.perf_counter()
+        for entry in entries:
+            if speed > 0:
+                delay = (entry["t"] - first) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await limit.acquire()
+            tasks.append(asyncio.create_task(send(client, entry)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return latencies, captured, statuses, elapsed
+
+
+def print_report(latencies, captured, statuses, elapsed: float) -> None:
+    total = sum(sum(counts.values()) for counts in statuses.values())
+    print(f"{total} requests in {elapsed:.1f} s ({total / elapsed if elapsed else 0:.0f} req/s)\n")
+    header = f"{'route':<40} {'count':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'capt p50':>9}  statuses"
+    print(header)
+    print("-" * len(header))
+    routes = sorted(statuses, key=lambda route: sum(statuses[route].values()), reverse=True)
+    for route in routes:
+        samples = sorted(latencies[route])
+        captured_p50 = percentile(sorted(captured[route]), 0.5)
+        codes = " ".join(f"{code}x{count}" for code, count in statuses[route].most_common())
+        if samples:
+            figures = " ".join(f"{percentile(samples, q):8.1f}" for q in (0.5, 0.9, 0.99)) + f" {samples[-1]:8.1f}"
+        else:
+            figures = " ".join(f"{'-':>8}" for _ in range(4))
+        print(f"{route[:40]:<40} {sum(statuses[route].values()):>6} {figures} {captured_p50:9.1f}  {codes}")
+    print("\nLatencies in ms; 'capt p50' is the server-side duration recorded at capture time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay captured traffic and report latency per route")
+    parser.add_argument("path", help="Capture file (TRAFFIC_CAPTURE_PATH); rotated .gz files are read too")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier; 0 = as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=100, help="Maximum requests in flight")
+    parser.add_argument("--header", action="append", default=[], help="Extra header, e.g. 'X-API-Key: ...'")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    entries = read_capture(args.path)
+    if args.limit:
+        entries = entries[:args.limit]
+    if not entries:
+        print(f"No captured requests found at {args.path}", file=sys.stderr)
+        sys.exit(1)
+
+    headers = dict(header.split(":", 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    span = entries[-1]["t"] - entries[0]["t"]
+    pace = f"{args.speed}x" if args.speed else "full speed"
+    print(f"Replaying {len(entries)} requests captured over {span:.1f} s at {pace}", file=sys.stderr)
+
+    results = asyncio.run(replay(entries, args.base_url, args.speed, args.concurrency, headers, args.timeout))
+    print_report(*results)
+
+
+if __name__ == "__main__":
+    main()
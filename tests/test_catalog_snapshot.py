@@ -0,0 +1,97 @@
+import random
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.crud_items import query_items
+from app.db.models import Item, ItemTombstone, utcnow
+
+pytest.importorskip("numpy")
+from app.db.catalog_snapshot import CatalogReadModel, CatalogSnapshot  # noqa: E402
+
+QUERIES = [
+    {},
+    {"is_active": False},
+    {"min_price": 20.0, "max_price": 60.0},
+    {"order_by": "price", "is_active": True},
+    {"order_by": "-price", "min_price": 10.0},
+    {"order_by": "updated_at"},
+    {"order_by": "-updated_at", "max_price": 80.0},
+]
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    random.seed(7)
+    start = utcnow() - timedelta(hours=1)
+    with factory() as db:
+        db.add_all([
+            Item(
+                id=item_id,
+                name=f"Item {item_id}",
+                price=float(random.randint(0, 10) * 10),  # plenty of ties
+                is_active=item_id % 3 != 0,
+                created_at=start,
+                updated_at=start + timedelta(seconds=random.randint(0, 20))
+            )
+            for item_id in range(1, 201)
+        ])
+        db.commit()
+    return factory
+
+
+def assert_matches_sql(read_model, session_factory):
+    snapshot = read_model.snapshot
+    with session_factory() as db:
+        for query in QUERIES:
+            for skip, limit in ((0, 1000), (15, 30)):
+                expected = [item.id for item in query_items(db, skip, limit, **query)]
+                assert [row["id"] for row in snapshot.query(skip, limit, **query)] == expected, query
+
+        first = snapshot.query(0, 1)[0]
+        item = db.get(Item, first["id"])
+        assert first == {column: getattr(item, column) for column in first}
+
+
+def test_snapshot_matches_sql_listing(session_factory):
+    read_model = CatalogReadModel(session_factory, max_staleness=60, feed_lag=0)
+    read_model._refresh()
+    assert len(read_model.snapshot) == 200
+    assert_matches_sql(read_model, session_factory)
+
+
+def test_merged_changes_match_sql_listing(session_factory):
+    read_model = CatalogReadModel(session_factory, max_staleness=60, feed_lag=0)
+    read_model._refresh()
+
+    with session_factory() as db:
+        for item in db.query(Item).filter(Item.id.in_([1, 2, 3, 50])):
+            item.price = 55.0
+            item.is_active = not item.is_active
+        db.delete(db.get(Item, 4))
+        db.add(ItemTombstone(item_id=4))
+        db.add(Item(id=500, name="new", price=5.0, is_active=True))
+        db.commit()
+
+    read_model._refresh()
+    assert len(read_model.snapshot) == 200
+    assert_matches_sql(read_model, session_factory)
+
+
+def test_missing_timestamps_sort_last_both_ways():
+    now = utcnow().replace(tzinfo=None)
+    rows = {
+        1: (1.0, True, now, None, "a", None),
+        2: (1.0, True, now, now, "b", None),
+        3: (1.0, True, now, now - timedelta(seconds=1), "c", None)
+    }
+    snapshot = CatalogSnapshot.empty().merged(rows, set(), None, 0.0)
+    assert [row["id"] for row in snapshot.query(0, 10, order_by="updated_at")] == [3, 2, 1]
+    assert [row["id"] for row in snapshot.query(0, 10, order_by="-updated_at")] == [2, 3, 1]
@@ -0,0 +1,124 @@
+import gzip
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+
+from app.middleware.compression import CompressedBodyCache, CompressionMiddleware, negotiate_encoding
+
+
+def test_negotiate_prefers_server_order():
+    assert negotiate_encoding("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+
+
+def test_negotiate_respects_quality():
+    assert negotiate_encoding("zstd;q=0.5, br;q=0.9", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip;q=0", ["gzip"]) is None
+
+
+def test_negotiate_identity_only():
+    assert negotiate_encoding("identity", ["zstd", "br", "gzip"]) is None
+    assert negotiate_encoding("", ["gzip"]) is None
+    assert negotiate_encoding("*", ["br", "gzip"]) == "br"
+
+
+BIG = b'{"items": [' + b",".join(b'{"id": %d, "name": "item"}' % i for i in range(200)) + b"]}"
+
+
+def make_app(**options):
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return Response(BIG, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"ok":true}', media_type="application/json")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield BIG
+            yield BIG
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return app
+
+
+def compression_middleware(app: FastAPI) -> CompressionMiddleware:
+    # The stack is built on the first request
+    middleware = app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+    return middleware
+
+
+async def fetch(app: FastAPI, path: str, accept_encoding: str):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Raw bytes, so httpx does not decode the body
+        async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response.headers, body
+
+
+@pytest.mark.asyncio
+async def test_compresses_large_bodies_and_tags_the_encoding():
+    headers, body = await fetch(make_app(minimum_size=1024), "/big", "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == '"v1-gzip"'
+    assert int(headers["content-length"]) == len(body) < len(BIG)
+    assert gzip.decompress(body) == BIG
+
+
+@pytest.mark.asyncio
+async def test_uncompressed_responses_still_vary():
+    app = make_app(minimum_size=1024)
+    for path, accept_encoding in (("/big", "identity"), ("/small", "gzip")):
+        headers, _ = await fetch(app, path, accept_encoding)
+        assert "content-encoding" not in headers
+        assert headers["vary"] == "Accept-Encoding"
+
+    headers, body = await fetch(app, "/big", "identity")
+    assert (headers["etag"], body) == ('"v1"', BIG)
+
+
+@pytest.mark.asyncio
+async def test_streaming_bodies_pass_through():
+    headers, body = await fetch(make_app(minimum_size=10), "/stream", "gzip")
+    assert "content-encoding" not in headers
+    assert body == BIG + BIG
+
+
+@pytest.mark.asyncio
+async def test_cacheable_paths_reuse_the_compressed_body():
+    app = make_app(minimum_size=1024, cacheable_paths=("/big",))
+    _, first = await fetch(app, "/big", "gzip")
+
+    middleware = compression_middleware(app)
+    calls = []
+    compress = middleware.compressors["gzip"]
+    middleware.compressors["gzip"] = lambda body: calls.append(body) or compress(body)
+
+    _, second = await fetch(app, "/big", "gzip")
+    assert second == first
+    assert calls == []
+    assert len(middleware.cache._entries) == 1
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = CompressedBodyCache(max_entries=100, max_bytes=800)
+    for i in range(10):
+        cache.put(("/items", "gzip", bytes([i])), b"x" * 100)
+    assert cache.size == 800
+    assert cache.get(("/items", "gzip", bytes([1]))) is None
+    assert cache.get(("/items", "gzip", bytes([9]))) is not None
+
+    # Larger than an eighth of the budget: never cached
+    cache.put(("/items", "gzip", b"big"), b"x" * 101)
+    assert cache.get(("/items", "gzip", b"big")) is None
+    assert cache.size == 800
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from app.core.events import BroadcastBackend, EventHub
+
+
+@pytest.mark.asyncio
+async def test_events_fan_out_to_matching_subscribers():
+    hub = EventHub(buffer_size=8)
+    everything = hub.subscribe()
+    only_two = hub.subscribe({2})
+
+    await hub.publish("created", 1, {"name": "a"})
+    await hub.publish("deleted", 2)
+
+    first = await everything.next_event(timeout=0.1)
+    assert (first.type, first.item_id) == ("created", 1)
+    assert first.sse.startswith(b"event: created\ndata: ")
+    assert (await everything.next_event(timeout=0.1)).item_id == 2
+    assert (await only_two.next_event(timeout=0.1)).type == "deleted"
+    assert await only_two.next_event(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped():
+    hub = EventHub(buffer_size=2)
+    slow = hub.subscribe()
+    for item_id in range(3):
+        await hub.publish("updated", item_id, {"price": 1.0})
+
+    assert slow.dropped
+    assert slow not in hub.subscribers
+    assert await slow.next_event(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_delivery_from_a_backend_thread_runs_on_the_loop():
+    hub = EventHub(buffer_size=8)
+    await hub.start()
+    subscriber = hub.subscribe()
+    message = b'{"type":"updated","item_id":3,"data":null}'
+
+    thread = threading.Thread(target=hub.deliver, args=(message,))
+    thread.start()
+    thread.join()
+
+    event = await subscriber.next_event(timeout=1)
+    assert (event.type, event.item_id) == ("updated", 3)
+
+
+def test_backend_must_implement_publish():
+    class Incomplete(BroadcastBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(lambda message: None)
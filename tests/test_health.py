@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from app.api import health
+from app.api.health import ReadinessCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_probes_share_one_check(monkeypatch):
+    calls = 0
+
+    def check() -> bool:
+        nonlocal calls
+        calls += 1
+        return True
+
+    monkeypatch.setattr(health, "_check_database", check)
+    cache = ReadinessCache(ttl=60)
+    results = await asyncio.gather(*(cache.get() for _ in range(10)))
+
+    assert calls == 1
+    assert all(status_code == 200 and b'"ready"' in body for status_code, body in results)
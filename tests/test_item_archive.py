@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.crud_items import get_item_changes, get_items_by_ids
+from app.db.item_archive import archive_batch, restore_items
+from app.db.models import ArchivedItem, Item, utcnow
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    stale = utcnow() - timedelta(days=30)
+    session.add_all([
+        Item(id=1, name="live", price=1.0, is_active=True, updated_at=stale),
+        Item(id=2, name="stale inactive", price=2.0, is_active=False, updated_at=stale),
+        Item(id=3, name="fresh inactive", price=3.0, is_active=False, updated_at=utcnow()),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_archive_moves_only_stale_inactive_items(db):
+    assert archive_batch(db, 100, inactive_after_days=7, max_age_days=0) == [2]
+    assert archive_batch(db, 100, inactive_after_days=7, max_age_days=0) == []
+
+    assert sorted(item.id for item in db.query(Item)) == [1, 3]
+    assert db.get(ArchivedItem, 2).name == "stale inactive"
+    # Reads by id fall through to the archive
+    assert sorted(get_items_by_ids(db, [1, 2, 4])) == [1, 2]
+
+
+def test_max_age_also_archives_active_items(db):
+    assert sorted(archive_batch(db, 100, inactive_after_days=7, max_age_days=14)) == [1, 2]
+
+
+def test_change_feed_reports_archived_then_restored_items(db):
+    _, _, _, watermark, _ = get_item_changes(db, None, 100, lag=0)
+    archive_batch(db, 100, inactive_after_days=7, max_age_days=0)
+
+    items, deleted, archived, watermark, has_more = get_item_changes(db, watermark, 100, lag=0)
+    assert (items, deleted, archived, has_more) == ([], [], [2], False)
+
+    assert [row.id for row in restore_items(db, [2, 99])] == [2]
+    db.commit()
+    items, _, archived, _, _ = get_item_changes(db, watermark, 100, lag=0)
+    assert [item.id for item in items] == [2]
+    assert archived == []
+    assert db.get(ArchivedItem, 2) is None
+
+
+def test_archived_max_id_is_not_reused(db):
+    # Archive item 3, the highest id, then create a new item
+    later = utcnow() + timedelta(days=30)
+    assert sorted(archive_batch(db, 100, inactive_after_days=7, max_age_days=0, now=later)) == [2, 3]
+    item = Item(name="new", price=4.0, is_active=True)
+    db.add(item)
+    db.commit()
+    assert item.id == 4
+
+    assert [row.id for row in restore_items(db, [3])] == [3]
+    db.commit()
+    assert sorted(item.id for item in db.query(Item)) == [1, 3, 4]
@@ -0,0 +1,108 @@
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.routes import api_router
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import ArchivedItem, Item, utcnow
+from app.db.session import get_db, get_read_db
+from app.middleware.error_handler import setup_error_handlers
+
+
+@pytest_asyncio.fixture
+async def client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([Item(id=item_id, name=f"item {item_id}", price=float(item_id)) for item_id in (1, 2, 3)])
+        db.add(ArchivedItem(id=7, name="archived", price=7.0, is_active=False, created_at=utcnow()))
+        db.commit()
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    setup_error_handlers(app)
+    app.include_router(api_router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_get_by_ids_keeps_order_dedupes_and_reports_missing(client):
+    response = await client.get("/api/v1/items", params={"ids": "3,99,1,3,7,98"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [3, 1, 7]
+    assert response.headers["x-missing-count"] == "2"
+    assert response.headers["x-missing-ids"] == "99,98"
+
+    response = await client.get("/api/v1/items", params={"ids": "2"})
+    assert "x-missing-ids" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_missing_ids_header_is_capped(client, monkeypatch):
+    monkeypatch.setattr(settings, "ITEM_MISSING_IDS_HEADER_MAX", 3)
+    response = await client.get("/api/v1/items", params={"ids": ",".join(map(str, range(100, 110)))})
+    assert response.headers["x-missing-count"] == "10"
+    assert response.headers["x-missing-ids"] == "100,101,102"
+
+
+@pytest.mark.asyncio
+async def test_batch_get_returns_missing_ids_in_the_body(client):
+    response = await client.post("/api/v1/items/batch-get", json={"ids": [7, 2, 99, 2]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [7, 2]
+    assert body["missing"] == [99]
+
+
+@pytest.mark.asyncio
+async def test_ids_reject_paging_filters_and_oversized_lists(client, monkeypatch):
+    for params in ({"skip": 1}, {"limit": 10}, {"min_price": 1}, {"order_by": "-price"}):
+        response = await client.get("/api/v1/items", params={"ids": "1,2", **params})
+        assert response.status_code == 400
+
+    monkeypatch.setattr(settings, "ITEM_BATCH_MAX_IDS", 2)
+    assert (await client.get("/api/v1/items", params={"ids": "1,2,3"})).status_code == 400
+    assert (await client.post("/api/v1/items/batch-get", json={"ids": [1, 2, 3]})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_returns_ids_in_request_order(client):
+    names = [f"bulk {i}" for i in range(5)]
+    response = await client.post("/api/v1/items/bulk", json=[{"name": name, "price": 1} for name in names])
+    assert response.status_code == 201
+    ids = response.json()["data"]["ids"]
+
+    response = await client.get("/api/v1/items", params={"ids": ",".join(map(str, ids))})
+    assert [item["name"] for item in response.json()] == names
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_rejects_oversized_bodies(client, monkeypatch):
+    monkeypatch.setattr(settings, "ITEM_BULK_MAX_BYTES", 64)
+    items = [{"name": "item", "price": 1}] * 10
+    response = await client.post("/api/v1/items/bulk", json=items)
+    assert response.status_code == 413
+
+    async def chunked():
+        yield b"["
+        yield b",".join([b'{"name": "item", "price": 1}'] * 10)
+        yield b"]"
+
+    response = await client.post("/api/v1/items/bulk", content=chunked(), headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.crud_items import get_item_changes, purge_tombstones, watermark_expired
+from app.db.models import Item, ItemTombstone, utcnow
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_recent_changes_are_held_back_until_the_lag_passes(db):
+    now = utcnow()
+    db.add_all([
+        Item(id=1, name="old", price=1.0, updated_at=now - timedelta(seconds=30)),
+        Item(id=3, name="recent", price=3.0, updated_at=now - timedelta(seconds=1))
+    ])
+    db.commit()
+    items, _, _, watermark, _ = get_item_changes(db, None, 100, lag=5, now=now)
+    assert [item.id for item in items] == [1]
+
+    # Timestamped before item 3 but committed after the poll: the watermark
+    # has not moved past it, so it is not lost
+    db.add(Item(id=2, name="slow transaction", price=2.0, updated_at=now - timedelta(seconds=2)))
+    db.commit()
+    items, _, _, _, _ = get_item_changes(db, watermark, 100, lag=5, now=now + timedelta(seconds=5))
+    assert [item.id for item in items] == [2, 3]
+
+
+def test_tombstones_are_purged_after_the_retention(db):
+    now = utcnow()
+    db.add_all([
+        ItemTombstone(item_id=1, deleted_at=now - timedelta(days=40)),
+        ItemTombstone(item_id=2, deleted_at=now - timedelta(days=1))
+    ])
+    db.commit()
+    assert purge_tombstones(db, retention_days=30) == 1
+    assert [row.item_id for row in db.query(ItemTombstone)] == [2]
+
+    assert watermark_expired((now - timedelta(days=31), 0, 0), retention_days=30, now=now)
+    assert not watermark_expired(((now - timedelta(days=29)).replace(tzinfo=None), 0, 0), retention_days=30, now=now)
@@ -0,0 +1,45 @@
+import json
+from datetime import date
+
+from app.db.item_stats import ItemFacts, ItemStats
+
+
+def make_stats():
+    stats = ItemStats([10.0, 100.0])
+    stats.install({"total": 0, "active": 0})
+    return stats
+
+
+def test_incremental_updates():
+    stats = make_stats()
+    today = date(2026, 1, 2)
+    cheap, pricey = ItemFacts(5.0, True, today), ItemFacts(150.0, True, today)
+    stats.apply(None, cheap)
+    stats.apply(None, pricey)
+    stats.apply(pricey, pricey._replace(is_active=False))
+
+    body = json.loads(stats.encoded(days=30))
+    assert body["total_count"] == 2
+    assert body["active_count"] == 1
+    assert body["price_avg"] == 5.0
+    assert [bucket["count"] for bucket in body["price_histogram"]] == [1, 0, 0]
+    assert body["created_per_day"] == {"2026-01-02": 2}
+    # 150 was the maximum; it is only known again after a query
+    assert stats.extremes_stale
+
+
+def test_encoding_is_cached_until_a_change():
+    stats = make_stats()
+    first = stats.encoded(days=30)
+    assert stats.encoded(days=30) is first
+    stats.apply(None, ItemFacts(1.0, True, None))
+    assert stats.encoded(days=30) is not first
+
+
+def test_encoding_is_cached_per_days_value():
+    stats = make_stats()
+    stats.apply(None, ItemFacts(1.0, True, date(2026, 1, 1)))
+    stats.apply(None, ItemFacts(1.0, True, date(2026, 1, 2)))
+    assert len(json.loads(stats.encoded(days=30))["created_per_day"]) == 2
+    assert json.loads(stats.encoded(days=1))["created_per_day"] == {"2026-01-02": 1}
+    assert len(json.loads(stats.encoded(days=30))["created_per_day"]) == 2
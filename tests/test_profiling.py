@@ -0,0 +1,75 @@
+import asyncio
+import json
+import sys
+
+import pytest
+from fastapi.concurrency import run_in_threadpool
+
+from app.middleware import profiling
+from app.middleware.profiling import THREADPOOL, Profiler, StackProfile, requested_output, request_stack
+
+
+def test_requested_output_from_header_or_query():
+    assert requested_output({"headers": [(b"x-profile", b"Speedscope")], "query_string": b""}) == "speedscope"
+    assert requested_output({"headers": [], "query_string": b"limit=5&__profile="}) == "html"
+    assert requested_output({"headers": [], "query_string": b"limit=5"}) is None
+
+
+def test_stack_profile_caps_distinct_stacks_and_exports_speedscope():
+    profile = StackProfile(max_stacks=2)
+    code = test_requested_output_from_header_or_query.__code__
+    profile.add((code,), 0.002)
+    profile.add((code, "(awaiting)"), 0.001)
+    profile.add(("(threadpool)",), 0.001)
+
+    assert profile.samples == 3
+    assert [stack["ms"] for stack in profile.hot_stacks(10)] == [2.0, 1.0, 1.0]
+    assert ("(other stacks)",) in profile.weights
+
+    document = json.loads(profile.speedscope("GET /items"))
+    sampled = document["profiles"][0]
+    assert sampled["endValue"] == 4.0
+    assert len(sampled["samples"]) == len(sampled["weights"]) == 3
+    assert document["shared"]["frames"][0]["name"] == code.co_qualname
+    assert b"GET /items" in profile.html("GET /items")
+
+
+@pytest.mark.asyncio
+async def test_request_stack_attributes_loop_frames_to_the_tracked_request():
+    profiler = Profiler(sample_interval=0.001, continuous_interval=0, max_stacks=100)
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/items"}
+    seen = []
+
+    async def app(scope, receive, send):
+        found = request_stack(sys._getframe(), profiler.requests)
+        seen.append(found)
+        await asyncio.sleep(0)
+
+    await profiler.track(app, scope, None, None)
+
+    tracked_scope, stack = seen[0]
+    assert tracked_scope is scope
+    assert stack[-1] is app.__code__
+    assert profiler.requests == {}
+
+
+@pytest.mark.asyncio
+async def test_threadpool_frames_are_attributed_through_the_anyio_hook():
+    # Reads anyio internals: this fails when an anyio upgrade moves them
+    assert profiling._WORKER_RUN is not None, "anyio WorkerThread.run not found"
+    profiler = Profiler(sample_interval=0.001, continuous_interval=0, max_stacks=100)
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/items"}
+    seen = []
+
+    def blocking():
+        seen.append(request_stack(sys._getframe(), profiler.requests))
+
+    async def app(scope, receive, send):
+        await run_in_threadpool(blocking)
+
+    await profiler.track(app, scope, None, None)
+
+    assert seen[0] is not None, "worker thread frame has no request context"
+    tracked_scope, stack = seen[0]
+    assert tracked_scope is scope
+    assert stack[0] == THREADPOOL and stack[-1] is blocking.__code__
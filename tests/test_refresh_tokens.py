@@ -0,0 +1,144 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.auth import hash_refresh_token
+from app.db.base import Base
+from app.db.crud_tokens import (
+    issue_refresh_token, rotate_refresh_token, sweep_expired_refresh_tokens,
+    sweep_refresh_tokens_periodically
+)
+from app.db.models import RefreshToken, User, utcnow
+from app.db.session import get_db
+from app.routers import auth
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(User(id=1, username="ana", email="ana@example.com", hashed_password="x"))
+        db.commit()
+    return factory
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def stored(db, token: str) -> RefreshToken:
+    db.expire_all()
+    return db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token)).one()
+
+
+def expire(db, token: str) -> None:
+    row = stored(db, token)
+    row.expires_at = utcnow() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_rotation_issues_a_new_token_in_the_same_family(db):
+    first = issue_refresh_token(db, 1, "ana")
+    second, subject = rotate_refresh_token(db, first)
+
+    assert subject == "ana"
+    assert second != first
+    assert stored(db, first).used_at is not None
+    assert stored(db, second).used_at is None
+    assert stored(db, second).family_id == stored(db, first).family_id
+
+
+def test_reuse_revokes_the_whole_family(db):
+    first = issue_refresh_token(db, 1, "ana")
+    second, _ = rotate_refresh_token(db, first)
+    other_login = issue_refresh_token(db, 1, "ana")
+
+    assert rotate_refresh_token(db, first) is None
+    assert stored(db, second).used_at is not None
+    assert rotate_refresh_token(db, second) is None
+    # Other families are untouched
+    assert rotate_refresh_token(db, other_login) is not None
+
+
+def test_expired_token_is_rejected_without_revoking(db):
+    first = issue_refresh_token(db, 1, "ana")
+    sibling = issue_refresh_token(db, 1, "ana", stored(db, first).family_id)
+    expire(db, first)
+
+    assert rotate_refresh_token(db, first) is None
+    assert stored(db, first).used_at is None
+    assert rotate_refresh_token(db, sibling) is not None
+
+
+def test_unknown_token_is_rejected(db):
+    assert rotate_refresh_token(db, "not-a-token") is None
+
+
+def test_sweep_deletes_only_expired_tokens(db):
+    kept = issue_refresh_token(db, 1, "ana")
+    gone = issue_refresh_token(db, 1, "ana")
+    expire(db, gone)
+
+    assert sweep_expired_refresh_tokens(db) == 1
+    assert [row.token_hash for row in db.query(RefreshToken)] == [hash_refresh_token(kept)]
+
+
+@pytest.mark.asyncio
+async def test_periodic_sweep_keeps_running(session_factory):
+    with session_factory() as db:
+        expire(db, issue_refresh_token(db, 1, "ana"))
+
+    task = asyncio.create_task(sweep_refresh_tokens_periodically(session_factory, 0.01))
+    try:
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            with session_factory() as db:
+                if db.query(RefreshToken).count() == 0:
+                    break
+        assert not task.done()
+    finally:
+        task.cancel()
+    with session_factory() as db:
+        assert db.query(RefreshToken).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_endpoint(session_factory):
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with session_factory() as db:
+        first = issue_refresh_token(db, 1, "ana")
+        expired = issue_refresh_token(db, 1, "ana")
+        expire(db, expired)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/auth/refresh", json={"refresh_token": first})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["access_token"] and body["refresh_token"] not in (None, first)
+
+        for token in (first, body["refresh_token"], expired, "not-a-token"):
+            response = await client.post("/auth/refresh", json={"refresh_token": token})
+            assert response.status_code == 401
+            assert response.headers["www-authenticate"] == "Bearer"
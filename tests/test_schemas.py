@@ -0,0 +1,46 @@
+from typing import Annotated, List
+
+import pytest
+from pydantic import AfterValidator, Field, TypeAdapter, ValidationError
+
+from app.models.schemas import ItemCreate, ItemUpdate
+
+
+def test_item_constraints_are_applied():
+    item = ItemCreate(name="  Widget ", price=9.999)
+    assert (item.name, item.price) == ("Widget", 10.0)
+    assert ItemUpdate(name=" x ").model_dump(exclude_unset=True) == {"name": "x"}
+
+    for payload in ({"name": "   ", "price": 1}, {"name": "a", "price": -1}, {"name": "a" * 101, "price": 1}):
+        with pytest.raises(ValidationError):
+            ItemCreate(**payload)
+
+
+def test_batch_validation_reports_element_positions():
+    adapter = TypeAdapter(List[ItemCreate])
+    items = adapter.validate_json(b'[{"name": "a", "price": 1.234}, {"name": "b", "price": 2}]')
+    assert [item.price for item in items] == [1.23, 2.0]
+
+    with pytest.raises(ValidationError) as exc:
+        adapter.validate_json(b'[{"name": "a", "price": 1}, {"name": "", "price": 1}]')
+    assert [error["loc"] for error in exc.value.errors()] == [(1, "name")]
+
+
+def test_bulk_limit_stops_validation_one_element_past_the_limit():
+    from app.api.routes import item_create_list_adapter
+    from app.core.config import settings
+
+    body = b"[" + b",".join([b'{"name": "a", "price": 1}'] * (settings.ITEM_BULK_MAX_ITEMS + 10)) + b"]"
+    with pytest.raises(ValidationError) as exc:
+        item_create_list_adapter.validate_json(body)
+    assert [(error["type"], error["loc"]) for error in exc.value.errors()] == [("too_long", ())]
+
+    # Same shape as the route adapter, counting the elements it validates
+    validated = []
+    counting = TypeAdapter(Annotated[
+        List[Annotated[ItemCreate, AfterValidator(lambda item: validated.append(item) or item)]],
+        Field(max_length=5)
+    ])
+    with pytest.raises(ValidationError):
+        counting.validate_json(b"[" + b",".join([b'{"name": "a", "price": 1}'] * 100) + b"]")
+    assert len(validated) == 6
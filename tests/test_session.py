@@ -0,0 +1,71 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.db import session
+from app.db.session import RecentWriters, ReplicaPool, client_key, get_db
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+
+
+def make_request(method: str) -> Request:
+    return Request({"type": "http", "method": method, "headers": [(b"authorization", b"Bearer t")], "client": None})
+
+
+def test_acquire_reads_cached_health_only(monkeypatch):
+    pool = ReplicaPool(["sqlite://", "sqlite://"], check_interval=60)
+    probes = []
+
+    def ping(replica) -> bool:
+        probes.append(replica)
+        return replica is pool.replicas[0]
+
+    monkeypatch.setattr(session.Replica, "ping", ping)
+
+    assert pool.acquire() is not None
+    assert probes == []
+
+    pool.check_health()
+    assert len(probes) == 2
+    assert {pool.acquire() for _ in range(4)} == {pool.replicas[0]}
+
+
+@pytest.mark.parametrize("commit, wrote", [(False, False), (True, True)])
+def test_writer_is_recorded_only_on_commit(monkeypatch, commit, wrote):
+    writers = RecentWriters(window=60)
+    monkeypatch.setattr(session, "recent_writers", writers)
+
+    dependency = get_db(make_request("POST"))
+    db = next(dependency)
+    if commit:
+        db.commit()
+    dependency.close()
+
+    assert writers.wrote_recently("Bearer t") is wrote
+
+
+@pytest.mark.asyncio
+async def test_write_issues_a_client_cookie_instead_of_keying_on_the_address():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, cookie_name=settings.READ_YOUR_WRITES_COOKIE)
+    keys = []
+
+    @app.api_route("/items", methods=["GET", "POST"])
+    async def items(request: Request):
+        keys.append(client_key(request))
+        return {}
+
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 50000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.example.com") as client:
+        await client.get("/items")
+        write = await client.post("/items")
+        await client.get("/items")
+        await client.post("/items")
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.example.com") as other:
+        await other.post("/items")
+
+    issued = write.cookies[settings.READ_YOUR_WRITES_COOKIE]
+    # Same address, yet the second client gets an id of its own
+    assert keys == [None, issued, issued, issued, keys[-1]]
+    assert keys[-1] not in (None, issued)
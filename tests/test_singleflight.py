@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.api.routes import _coalesced
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.db.session import recent_writers
+
+
+def make_request(client: str) -> Request:
+    cookie = f"{settings.READ_YOUR_WRITES_COOKIE}={client}".encode()
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"cookie", cookie)]})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("item:1", fetch) for _ in range(50)))
+    assert results == [1] * 50
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_shared_and_not_cached():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return "fresh"
+
+    assert await flight.do("k", ok) == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_coalesced_read_survives_cancelled_leader():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    leader_db = Session(bind=engine)
+    started = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def fetch(db):
+        loop.call_soon_threadsafe(started.set)
+        assert db is not leader_db
+        return db.execute(text("SELECT 42")).scalar()
+
+    request = make_request("reader-1")
+    leader = asyncio.ensure_future(_coalesced(("answer",), request, leader_db, fetch))
+    follower = asyncio.ensure_future(_coalesced(("answer",), request, leader_db, fetch))
+    await started.wait()
+    leader.cancel()
+    leader_db.close()  # the leader's dependency teardown
+    assert await follower == 42
+
+
+@pytest.mark.asyncio
+async def test_recent_writer_does_not_join_an_older_read():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    db = Session(bind=engine)
+    started, release = asyncio.Event(), threading.Event()
+    loop = asyncio.get_running_loop()
+    reads = []
+
+    def fetch(db):
+        reads.append(db)
+        if len(reads) == 1:
+            # The first read began before the write and is still running
+            loop.call_soon_threadsafe(started.set)
+            release.wait(5)
+            return "old"
+        return "new"
+
+    leader = asyncio.ensure_future(_coalesced(("item", 1), make_request("reader-2"), db, fetch))
+    await started.wait()
+    recent_writers.record("writer")
+    try:
+        assert await _coalesced(("item", 1), make_request("writer"), db, fetch) == "new"
+    finally:
+        release.set()
+    assert await leader == "old"
+    assert len(reads) == 2
+    db.close()
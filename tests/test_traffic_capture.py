@@ -0,0 +1,60 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware.traffic_capture import TrafficCaptureMiddleware, TrafficRecorder, body_shape
+
+
+def test_body_shape_keeps_only_structure_by_default():
+    shape = body_shape("application/json", b'{"name": "x", "price": 1.5, "tags": [null, true], "qty": 2}', 1024)
+    assert shape == {"json_types": {"name": "str", "price": "float", "tags": ["null", "bool"], "qty": "int"}}
+
+    shape = body_shape("application/x-www-form-urlencoded", b"username=bob&password=hunter2", 1024)
+    assert shape == {"form_keys": ["username", "password"]}
+
+    assert body_shape("text/csv", b"a,b\n1,2\n", 1024) == {"size": 8, "type": "text/csv"}
+    assert body_shape("application/json", b"", 1024) is None
+
+
+def test_body_values_are_opt_in_and_mask_credentials():
+    body = b'{"name": "x", "refresh_token": "secret", "items": [{"password": "p"}]}'
+    shape = body_shape("application/json", body, 1024, values=True)
+    assert shape == {"json": {"name": "x", "refresh_token": "***", "items": [{"password": "***"}]}}
+
+    shape = body_shape("application/x-www-form-urlencoded", b"username=bob&password=hunter2", 1024, values=True)
+    assert shape == {"form": [("username", "bob"), ("password", "***")]}
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_sampled_requests(tmp_path):
+    app = FastAPI()
+
+    @app.post("/items/{item_id}")
+    async def update(item_id: int, body: dict):
+        return {"id": item_id}
+
+    recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl"), max_bytes=1024 * 1024, backups=1)
+    app.add_middleware(TrafficCaptureMiddleware, recorder=recorder, sample_rate=1.0, max_body=1024)
+    recorder.start()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post(
+                "/items/7?token=abc&verbose=1",
+                json={"email": "bob@example.com", "password": "hunter2"},
+                headers={"Authorization": "Bearer xyz"}
+            )
+    finally:
+        recorder.stop()
+
+    content = (tmp_path / "traffic.jsonl").read_text()
+    for secret in ("bob@example.com", "hunter2", "abc", "xyz"):
+        assert secret not in content
+    entry = json.loads(content)
+    assert entry["m"] == "POST"
+    assert entry["r"] == "/items/{item_id}"
+    assert entry["q"] == "token=%2A%2A%2A&verbose=1"
+    assert entry["b"] == {"json_types": {"email": "str", "password": "str"}}
+    assert entry["s"] == 200
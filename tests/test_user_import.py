@@ -0,0 +1,82 @@
+from typing import Optional
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import crud_users
+from app.db.base import Base
+from app.db.crud_users import bulk_create_users
+from app.db.models import User
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # bcrypt is not what is under test
+    monkeypatch.setattr(crud_users, "hash_passwords", lambda passwords: [f"hashed:{p}" for p in passwords])
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(username="taken", email="taken@example.com", hashed_password="x"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def user(name: str, email: Optional[str] = None) -> dict:
+    return {"username": name, "email": email or f"{name}@example.com", "password": "secret"}
+
+
+def statuses(results) -> list:
+    return [(result["row"], result["username"], result["status"]) for result in results]
+
+
+def test_duplicates_and_invalid_rows_are_reported_in_input_order(db):
+    rows = [
+        user("ana"),
+        user("taken"),
+        user("bia", "taken@example.com"),
+        {"username": "bad", "email": "not-an-email", "password": "x"},
+        user("ana", "other@example.com"),
+        user("caio", "ana@example.com"),
+        user("duda")
+    ]
+    results = list(bulk_create_users(db, rows, chunk_size=100))
+
+    assert statuses(results) == [
+        (0, "ana", "created"),
+        (1, "taken", "duplicate"),
+        (2, "bia", "duplicate"),
+        (3, "bad", "invalid"),
+        (4, "ana", "duplicate"),
+        (5, "caio", "duplicate"),
+        (6, "duda", "created")
+    ]
+    assert results[2]["detail"] == "Email already registered"
+    assert sorted(name for (name,) in db.query(User.username)) == ["ana", "duda", "taken"]
+    assert db.query(User).filter(User.username == "ana").one().hashed_password == "hashed:secret"
+
+
+def test_row_numbers_and_duplicates_span_chunk_boundaries(db):
+    rows = [user(f"user{i}") for i in range(7)] + [user("user1"), {"username": "x"}]
+    results = list(bulk_create_users(db, rows, chunk_size=3))
+
+    assert [result["row"] for result in results] == list(range(9))
+    assert [result["status"] for result in results] == ["created"] * 7 + ["duplicate", "invalid"]
+    assert db.query(User).count() == 8
+
+
+def test_concurrent_registration_falls_back_to_row_by_row(db, monkeypatch):
+    def hash_and_race(passwords):
+        # Another request registers "eva" between the uniqueness check and the INSERT
+        db.execute(insert(User), [{"username": "eva", "email": "eva@other.com", "hashed_password": "x"}])
+        db.commit()
+        return [f"hashed:{p}" for p in passwords]
+
+    monkeypatch.setattr(crud_users, "hash_passwords", hash_and_race)
+    results = list(bulk_create_users(db, [user("dan"), user("eva"), user("fay")], chunk_size=10))
+
+    assert statuses(results) == [(0, "dan", "created"), (1, "eva", "duplicate"), (2, "fay", "created")]
+    assert results[1]["detail"] == "Username or email already registered"
+    assert db.query(User).filter(User.username == "eva").one().email == "eva@other.com"
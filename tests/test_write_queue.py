@@ -0,0 +1,62 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.events import item_events
+from app.db.base import Base
+from app.db.models import Item
+from app.db.write_queue import FlushResult, ItemWriteQueue
+from app.models.schemas import ItemUpdate
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(Item(id=1, name="a", price=1.0, is_active=True))
+        db.commit()
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_ack_and_events_cover_only_existing_items(session_factory):
+    queue = ItemWriteQueue(session_factory, flush_interval=60, max_batch=100)
+    subscriber = item_events.subscribe()
+    try:
+        committed = queue.enqueue(1, {"price": 2.0})
+        queue.enqueue(555, {"price": 3.0})
+        await queue.flush()
+
+        assert await committed == FlushResult({1}, set())
+        assert (await subscriber.next_event(timeout=0.1)).item_id == 1
+        assert await subscriber.next_event(timeout=0.01) is None
+    finally:
+        item_events.unsubscribe(subscriber)
+    with session_factory() as db:
+        assert db.get(Item, 1).price == 2.0
+
+
+@pytest.mark.asyncio
+async def test_bad_row_does_not_drop_the_rest_of_the_batch(session_factory):
+    with session_factory() as db:
+        db.add(Item(id=2, name="b", price=1.0, is_active=True))
+        db.commit()
+    queue = ItemWriteQueue(session_factory, flush_interval=60, max_batch=100)
+    committed = queue.enqueue(1, {"price": 9.0})
+    queue.enqueue(2, {"price": None})
+    await queue.flush()
+
+    assert await committed == FlushResult({1}, {2})
+    with session_factory() as db:
+        assert (db.get(Item, 1).price, db.get(Item, 2).price) == (9.0, 1.0)
+
+
+def test_update_rejects_null_for_required_columns():
+    assert ItemUpdate(description=None).model_dump(exclude_unset=True) == {"description": None}
+    for field in ("name", "price", "is_active"):
+        with pytest.raises(ValidationError):
+            ItemUpdate(**{field: None})